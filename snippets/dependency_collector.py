@@ -1,16 +1,51 @@
 from __future__ import annotations
+import functools
+import importlib.util
+import os
 import re
+from bisect import bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Tuple, Set
+from typing import Iterator, Optional, List, Dict, Tuple, Set
 
+# pandas takes a couple of hundred milliseconds to import, so only look it
+# up here and load it on first use in get_pandas(). Code that needs pandas
+# calls get_pandas() rather than testing HAS_PANDAS.
 try:
-    import pandas as pd
-    HAS_PANDAS = True
+    HAS_PANDAS = importlib.util.find_spec("pandas") is not None
 except (ImportError, ValueError, Exception):
     HAS_PANDAS = False
 
+@functools.cache
+def get_pandas():
+    """
+    Import pandas on first call and return the module.
+
+    pandas can be installed yet fail to import (an ABI mismatch, a broken
+    numpy); that returns None as well, so callers fall back to their
+    plain-text output. HAS_PANDAS is updated to match. The result is cached;
+    get_pandas.cache_clear() makes the next call try the import again.
+
+    Returns:
+        The pandas module, or None if it is unavailable.
+    """
+    global HAS_PANDAS
+    try:
+        import pandas
+    except (ImportError, ValueError, Exception):
+        HAS_PANDAS = False
+        return None
+    HAS_PANDAS = True
+    return pandas
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except (ImportError, ValueError, Exception):
+    HAS_NUMPY = False
+
 try:
     import networkx as nx
     HAS_NETWORKX = True
@@ -23,13 +58,140 @@ try:
 except (ImportError, ValueError, Exception):
     HAS_PLOTLY = False
 
-@dataclass
+# Graph layout functions by name, used by visualize_dependency_graph()
+_LAYOUTS = {
+    'spring': lambda G: nx.spring_layout(G, seed=42),
+    'circular': lambda G: nx.circular_layout(G),
+    'random': lambda G: nx.random_layout(G, seed=42),
+    'shell': lambda G: nx.shell_layout(G),
+    'kamada_kawai': lambda G: nx.kamada_kawai_layout(G),
+}
+
+# Write buffer for graph output files, so multi-MB figure JSON goes out in few syscalls
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# HTML page pieces shared by the save_dependency_graph_* methods. The figure
+# JSON is written between them directly, so the full page is never built as
+# one string in memory.
+_HTML_HEADER = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>LaTeX Dependency Graph - {root_file}</title>
+    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+    <style>
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            margin: 0;
+            padding: 20px;
+            background-color: #f5f5f5;
+        }}
+        .container {{
+            max-width: 1200px;
+            margin: 0 auto;
+            background: white;
+            border-radius: 8px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+            padding: 20px;
+        }}
+        h1 {{
+            color: #333;
+            text-align: center;
+            margin-bottom: 10px;
+        }}
+        .subtitle {{
+            text-align: center;
+            color: #666;
+            margin-bottom: 30px;
+        }}
+        #graph {{
+            width: 100%;
+            height: 800px;
+        }}
+        .info {{
+            background: #f8f9fa;
+            border-left: 4px solid #007acc;
+            padding: 15px;
+            margin: 20px 0;
+            border-radius: 4px;
+        }}
+        .legend {{
+            display: flex;
+            justify-content: center;
+            gap: 20px;
+            margin: 20px 0;
+            flex-wrap: wrap;
+        }}
+        .legend-item {{
+            display: flex;
+            align-items: center;
+            gap: 5px;
+        }}
+        .legend-color {{
+            width: 16px;
+            height: 16px;
+            border-radius: 50%;
+            display: inline-block;
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>LaTeX Dependency Graph</h1>
+        <p class="subtitle">Interactive visualization of file dependencies for {root_file}</p>
+
+        <div class="info">
+            <strong>Graph Statistics:</strong><br>
+            Generated on {generated}<br>
+            Root file: {root_file}"""
+
+_HTML_LEGEND = """
+        <div class="legend">
+            <div class="legend-item">
+                <span class="legend-color" style="background-color: #FF6B6B;"></span>
+                <span>Root File</span>
+            </div>
+            <div class="legend-item">
+                <span class="legend-color" style="background-color: #4ECDC4;"></span>
+                <span>TeX Files (Existing)</span>
+            </div>
+            <div class="legend-item">
+                <span class="legend-color" style="background-color: #95A5A6;"></span>
+                <span>Missing Files</span>
+            </div>
+            <div class="legend-item">
+                <span class="legend-color" style="background-color: #45B7D1;"></span>
+                <span>Other Files</span>
+            </div>
+        </div>
+
+        <div id="graph"></div>
+    </div>
+"""
+
+_HTML_RENDER = """
+        // Render the plot
+        Plotly.newPlot('graph', figureData.data, figureData.layout, {
+            responsive: true,
+            displayModeBar: true,
+            modeBarButtonsToRemove: ['pan2d', 'lasso2d'],
+            displaylogo: false
+        });
+    </script>
+</body>
+</html>"""
+
+
+@dataclass(frozen=True, slots=True)
 class DependencyEntry:
     """
     Represents a single file dependency in a LaTeX project.
 
     This dataclass stores information about files included or referenced
     in a LaTeX document, including the type of inclusion and location.
+    It uses __slots__ to keep per-entry memory low on large projects, and is
+    frozen because collected entries are shared between memoized results.
 
     Attributes:
         file_path: The path to the dependent file (relative to project root).
@@ -68,28 +230,70 @@ class LatexDependencyCollector:
     - Other file references
 
     The collector builds a complete dependency tree starting from a root file
-    and recursively following all inclusions.
+    and following all inclusions.
 
     Attributes:
         base_path (Path): Base directory path where the LaTeX project is located.
         dependencies (List[DependencyEntry]): List of all dependency entries found.
         processed_files (Set[str]): Set of files that have already been processed
-                                   to avoid infinite recursion.
+                                   to avoid processing a file twice.
+        cycles (List[List[str]]): Inclusion cycles found during the last collection,
+                                  each given as a file path sequence that starts and
+                                  ends with the same file.
+        _parse_cache (Dict[str, Tuple[int, int, List[Tuple[str, str, int]]]]):
+                                   Parsed dependencies per file, keyed by path and
+                                   validated against (st_mtime_ns, st_size).
 
     Regex patterns:
-        INPUT_RE: Matches \\input{filename} and \\input filename
-        INCLUDE_RE: Matches \\include{filename}
-        USEPACKAGE_RE: Matches \\usepackage[options]{package}
-        DOCUMENTCLASS_RE: Matches \\documentclass[options]{class}
-        BIB_RE: Matches \\bibliography{file} and \\addbibresource{file}
+        DEPENDENCY_RE: Single alternation matching all supported inclusion commands:
+            \\input{filename} and \\input filename, \\include{filename},
+            \\usepackage[options]{package}, \\documentclass[options]{class},
+            \\bibliography{file} and \\addbibresource{file}.
+            The command name is captured in the ``kind`` group and the argument
+            in ``arg`` (or ``bare`` for the brace-less \\input form).
+        COMMENT_RE: Matches a TeX comment, i.e. an unescaped % up to the end of
+            the line. Any run of escaped backslashes before it is kept in group 1.
+        NEWLINE_RE: Matches a line break, for the line start positions in
+            _line_numbers().
     """
 
-    # Regex patterns for different types of file inclusions
-    INPUT_RE = re.compile(r"""\\input\s*(?:\{([^}]+)\}|(\S+))""")
-    INCLUDE_RE = re.compile(r"""\\include\s*\{([^}]+)\}""")
-    USEPACKAGE_RE = re.compile(r"""\\usepackage\s*(?:\[[^\]]*\])?\s*\{([^}]+)\}""")
-    DOCUMENTCLASS_RE = re.compile(r"""\\documentclass\s*(?:\[[^\]]*\])?\s*\{([^}]+)\}""")
-    BIB_RE = re.compile(r"""\\(?:bibliography|addbibresource)\s*\{([^}]+)\}""")
+    # Optional [options] block shared by all commands
+    _OPT = r"""\s*(?:\[[^\]]*\])?\s*"""
+
+    # Single pattern for all file inclusions, dispatched on the ``kind`` group.
+    # LaTeX command syntax is ASCII-only, so \s and \S skip Unicode lookups.
+    DEPENDENCY_RE = re.compile(
+        r"""\\(?:(?P<kind>include|usepackage|documentclass|bibliography|addbibresource|input)"""
+        + _OPT +
+        r"""\{(?P<arg>[^}\n]+)\}|input\s*(?P<bare>\S+))""",
+        re.ASCII,
+    )
+
+    # Unescaped % through end of line; \\% is a line break followed by a comment
+    COMMENT_RE = re.compile(r"""(?<!\\)((?:\\\\)*)%[^\n]*""", re.ASCII)
+
+    # Line breaks, for line start positions
+    NEWLINE_RE = re.compile(r"""\n""")
+
+    # Only TeX sources are scanned; anything larger is assumed to be generated data
+    PARSED_SUFFIXES = frozenset({'.tex', '.ltx', '.sty', '.cls'})
+    MAX_PARSE_BYTES = 16 * 1024 * 1024
+
+    # Below this many matches per file, bisect beats numpy's setup cost
+    NUMPY_MIN_MATCHES = 64
+
+    # Commands whose argument is a comma-separated list of names
+    LIST_KINDS = frozenset({'usepackage', 'bibliography'})
+
+    # Maps the matched command name to the reported include_type
+    INCLUDE_TYPES = {
+        'input': 'input',
+        'include': 'include',
+        'usepackage': 'usepackage',
+        'documentclass': 'documentclass',
+        'bibliography': 'bibliography',
+        'addbibresource': 'bibliography',
+    }
 
     def __init__(self, base_path: Path | str):
         """
@@ -105,6 +309,35 @@ class LatexDependencyCollector:
         self.base_path = Path(base_path)
         self.dependencies: List[DependencyEntry] = []
         self.processed_files: Set[str] = set()
+        self.cycles: List[List[str]] = []
+        self._parse_cache: Dict[str, Tuple[int, int, List[Tuple[str, str, int]]]] = {}
+        self._stat_cache: Dict[str, Tuple[bool, bool]] = {}
+        self._norm_cache: Dict[str, str] = {}
+        self._layout_cache: Optional[Tuple[Tuple[str, frozenset, frozenset], Dict]] = None
+        self._result_cache: Dict[str, Tuple[Tuple[DependencyEntry, ...], Set[str], List[List[str]],
+                                            Dict[str, Optional[Tuple[int, int]]]]] = {}
+
+    def clear_cache(self) -> None:
+        """
+        Drop all cached per-file parse results, collected dependency lists and graph layouts.
+
+        Cached entries are already invalidated automatically when a file's
+        modification time or size changes; this is only needed to force a
+        full re-parse (e.g. after edits that preserve both).
+        """
+        self._parse_cache.clear()
+        self._result_cache.clear()
+        self._layout_cache = None
+
+    def _file_signature(self, file_path: str) -> Optional[Tuple[int, int]]:
+        """
+        Return (st_mtime_ns, st_size) for a file relative to base_path, or None if missing.
+        """
+        try:
+            st = (self.base_path / file_path).stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
 
     def _normalize_file_path(self, file_path: str, from_file: str) -> str:
         """
@@ -114,15 +347,36 @@ class LatexDependencyCollector:
         In LaTeX, \\input and \\include paths are typically relative to the main document
         directory, not the including file's directory.
 
+        Results are memoized per raw path, since packages and shared inputs are
+        typically referenced from many files. The including file does not
+        affect the result and is therefore not part of the cache key.
+
         Args:
             file_path: The raw file path from the LaTeX command.
             from_file: The file that contains the inclusion (for context only).
 
+        Returns:
+            Normalized path relative to base_path.
+        """
+        normalized = self._norm_cache.get(file_path)
+        if normalized is None:
+            normalized = self._norm_cache[file_path] = self._resolve_file_path(file_path)
+        return normalized
+
+    def _resolve_file_path(self, file_path: str) -> str:
+        """
+        Resolve a raw LaTeX file path to a path relative to base_path.
+
+        This is the uncached worker behind _normalize_file_path().
+
+        Args:
+            file_path: The raw file path from the LaTeX command.
+
         Returns:
             Normalized path relative to base_path.
         """
         # Handle common LaTeX file extensions
-        if not Path(file_path).suffix:
+        if not os.path.splitext(file_path)[1]:
             # Add .tex for input/include if no extension
             file_path += '.tex'
 
@@ -150,7 +404,12 @@ class LatexDependencyCollector:
         """
         Parse a single file for dependencies.
 
-        Reads the file and extracts all file inclusions using regex patterns.
+        Reads the whole file once, blanks out TeX comments and scans the rest
+        with a single combined regex. Line numbers are recovered from the
+        match offsets afterwards (see _line_numbers()). Results are cached per file and
+        reused as long as the file's mtime and size are unchanged. Files
+        whose suffix is not in PARSED_SUFFIXES or that are larger than
+        MAX_PARSE_BYTES are not read at all.
 
         Args:
             file_path: Path to the file to parse (relative to base_path).
@@ -158,95 +417,235 @@ class LatexDependencyCollector:
         Returns:
             List of tuples (include_type, included_file, line_number).
         """
+        if os.path.splitext(file_path)[1].lower() not in self.PARSED_SUFFIXES:
+            return []
+
         full_path = self.base_path / file_path
-        if not full_path.exists():
+        try:
+            st = full_path.stat()
+        except OSError:
+            return []
+        if st.st_size > self.MAX_PARSE_BYTES:
             return []
 
-        dependencies = []
+        cached = self._parse_cache.get(file_path)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+
         try:
-            with open(full_path, 'r', encoding='utf-8', errors='replace') as f:
-                for line_num, line in enumerate(f, 1):
-                    # Check each type of inclusion
-                    for pattern_name, pattern in [
-                        ('input', self.INPUT_RE),
-                        ('include', self.INCLUDE_RE),
-                        ('usepackage', self.USEPACKAGE_RE),
-                        ('documentclass', self.DOCUMENTCLASS_RE),
-                        ('bibliography', self.BIB_RE)
-                    ]:
-                        matches = pattern.findall(line)
-                        for match in matches:
-                            # Handle different capture group structures
-                            if isinstance(match, tuple):
-                                # For patterns with multiple capture groups (like input)
-                                dep_file = match[0] or match[1]
-                            else:
-                                # For patterns with single capture group
-                                dep_file = match
-
-                            if dep_file:
-                                dependencies.append((pattern_name, dep_file.strip(), line_num))
+            text = full_path.read_text(encoding='utf-8', errors='replace')
         except Exception:
             # Skip files that can't be read
-            pass
+            return []
+
+        # Drop comments in one pass; newlines are kept so line numbers still hold
+        if '%' in text:
+            text = self.COMMENT_RE.sub(r'\1', text)
+
+        matches = []
+        for m in self.DEPENDENCY_RE.finditer(text):
+            kind = m.group('kind')
+            if kind is None:
+                include_type = 'input'
+                dep_file = m.group('bare')
+            else:
+                include_type = self.INCLUDE_TYPES[kind]
+                dep_file = m.group('arg')
+
+            if kind in self.LIST_KINDS:
+                # \usepackage{a,b,c} yields one entry per package
+                for name in dep_file.split(','):
+                    name = name.strip()
+                    if name:
+                        matches.append((include_type, name, m.start()))
+                continue
+
+            dep_file = dep_file.strip()
+            if not dep_file:
+                continue
 
+            matches.append((include_type, dep_file, m.start()))
+
+        line_nums = self._line_numbers(text, [offset for _, _, offset in matches])
+        dependencies = [(include_type, dep_file, line_num)
+                        for (include_type, dep_file, _), line_num in zip(matches, line_nums)]
+
+        self._parse_cache[file_path] = (st.st_mtime_ns, st.st_size, dependencies)
         return dependencies
 
-    def _collect_dependencies_recursive(self, file_path: str, depth: int = 0) -> None:
+    @classmethod
+    def _line_numbers(cls, text: str, offsets: List[int]) -> List[int]:
         """
-        Recursively collect dependencies starting from a file.
+        Map character offsets in text to 1-based line numbers.
+
+        Uses a vectorized numpy searchsorted over the newline positions when
+        numpy is available and there are enough offsets to amortize it;
+        otherwise bisects over a list of line start positions.
 
         Args:
-            file_path: Path to the file to process (relative to base_path).
-            depth: Current recursion depth (for cycle detection).
-        """
-        # Avoid infinite recursion
-        if depth > 50 or file_path in self.processed_files:
-            return
+            text: The text the offsets refer to.
+            offsets: Character offsets into text, in any order.
 
-        self.processed_files.add(file_path)
+        Returns:
+            List of line numbers, one per offset.
+        """
+        if not offsets:
+            return []
 
-        # Parse dependencies in this file
-        deps = self._parse_file_dependencies(file_path)
+        if HAS_NUMPY and len(offsets) >= cls.NUMPY_MIN_MATCHES:
+            # One array element per character, so indices are character offsets
+            if text.isascii():
+                chars = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+            else:
+                chars = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+            newlines = np.flatnonzero(chars == 10)
+            return (np.searchsorted(newlines, offsets, side='left') + 1).tolist()
 
-        for include_type, raw_dep_path, line_num in deps:
-            # Normalize the path
-            normalized_path = self._normalize_file_path(raw_dep_path, file_path)
+        line_starts = [0]
+        line_starts.extend(nl.end() for nl in cls.NEWLINE_RE.finditer(text))
+        return [bisect_right(line_starts, offset) for offset in offsets]
 
-            # Check if file exists
-            full_path = self.base_path / normalized_path
-            exists = full_path.exists()
-            is_tex = full_path.suffix.lower() == '.tex'
+    def _collect_dependencies_iterative(self, root_file: str) -> None:
+        """
+        Collect dependencies starting from a file using an explicit stack.
+
+        Files are walked depth-first, and entries are emitted in document
+        order: each dependency is recorded, and an included .tex file is
+        entered before the next dependency of its parent, so the result
+        matches a recursive walk. When a file is entered, the .tex files it
+        includes are submitted to a thread pool so their file I/O and regex
+        work overlaps with the walk; bookkeeping stays on the calling thread.
+        The pool only lives for the duration of the call. Each file is
+        entered at most once, so the visited set alone guards against cycles
+        and there is no limit on inclusion depth.
 
-            # Create dependency entry
-            entry = DependencyEntry(
-                file_path=normalized_path,
-                include_type=include_type,
-                included_from=file_path,
-                line_number=line_num,
-                exists=exists,
-                is_tex_file=is_tex
-            )
+        Args:
+            root_file: Path to the file to start from (relative to base_path).
+        """
+        pending: Dict[str, Future] = {}
+
+        def enter(file_path: str) -> Iterator[Tuple[DependencyEntry, bool]]:
+            """Mark a file visited and return its entries, flagged if they lead to a new .tex file."""
+            self.processed_files.add(file_path)
+            future = pending.pop(file_path, None)
+            deps = future.result() if future is not None else self._parse_file_dependencies(file_path)
+
+            entries = []
+            for include_type, raw_dep_path, line_num in deps:
+                # Normalize the path
+                normalized_path = self._normalize_file_path(raw_dep_path, file_path)
+
+                # Check if file exists (once per path and collection run)
+                file_info = self._stat_cache.get(normalized_path)
+                if file_info is None:
+                    full_path = self.base_path / normalized_path
+                    file_info = (full_path.exists(), full_path.suffix.lower() == '.tex')
+                    self._stat_cache[normalized_path] = file_info
+                exists, is_tex = file_info
+
+                # Create dependency entry
+                entry = DependencyEntry(
+                    file_path=normalized_path,
+                    include_type=include_type,
+                    included_from=file_path,
+                    line_number=line_num,
+                    exists=exists,
+                    is_tex_file=is_tex
+                )
+                entries.append((entry, exists and is_tex and include_type in ('input', 'include')))
+
+            # Start parsing the included .tex files ahead of the walk
+            children = {e.file_path for e, follow in entries
+                        if follow and e.file_path not in self.processed_files and e.file_path not in pending}
+            if len(children) > 1:
+                for child in children:
+                    pending[child] = executor.submit(self._parse_file_dependencies, child)
+            return iter(entries)
+
+        # Worker threads are only started on the first submit, so projects
+        # without fan-out never spawn any
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+            stack = [enter(root_file)]
+            while stack:
+                for entry, follow in stack[-1]:
+                    self.dependencies.append(entry)
+                    # Descend into .tex files that have not been seen yet
+                    if follow and entry.file_path not in self.processed_files:
+                        stack.append(enter(entry.file_path))
+                        break
+                else:
+                    stack.pop()
+
+    def _find_cycles(self, root_file: str) -> List[List[str]]:
+        """
+        Find inclusion cycles among the processed files.
 
-            self.dependencies.append(entry)
+        Runs a single iterative depth-first search over the edges collected in
+        self.dependencies, using a three-color map (white/gray/black). Every
+        edge to a gray file is a back edge and closes a cycle, which is read
+        off the current DFS path, so the graph is traversed only once.
 
-            # Recursively process .tex files
-            if exists and is_tex and include_type in ('input', 'include'):
-                self._collect_dependencies_recursive(normalized_path, depth + 1)
+        Args:
+            root_file: The root file the collection started from; searched first.
 
-    def collect_dependencies(self, root_file: str = "main.tex") -> List[DependencyEntry]:
+        Returns:
+            List of cycles, each a list of file paths starting and ending with the
+            same file. Empty if the inclusion graph is acyclic.
+        """
+        WHITE, GRAY, BLACK = 0, 1, 2
+
+        # Only processed files have outgoing edges, so only edges between them can form cycles
+        adjacency: Dict[str, Dict[str, None]] = {}
+        for dep in self.dependencies:
+            if dep.file_path in self.processed_files:
+                adjacency.setdefault(dep.included_from, {})[dep.file_path] = None
+
+        color: Dict[str, int] = {}
+        cycles: List[List[str]] = []
+        for start in [root_file, *adjacency]:
+            if color.get(start, WHITE) != WHITE:
+                continue
+            color[start] = GRAY
+            path = [start]
+            stack = [iter(adjacency.get(start, ()))]
+            while stack:
+                for child in stack[-1]:
+                    child_color = color.get(child, WHITE)
+                    if child_color == WHITE:
+                        color[child] = GRAY
+                        path.append(child)
+                        stack.append(iter(adjacency.get(child, ())))
+                        break
+                    if child_color == GRAY:
+                        cycles.append(path[path.index(child):] + [child])
+                else:
+                    # All children done: node leaves the DFS path
+                    color[path.pop()] = BLACK
+                    stack.pop()
+        return cycles
+
+    def collect_dependencies(self, root_file: str = "main.tex") -> Tuple[DependencyEntry, ...]:
         """
         Collect all dependencies starting from a root file.
 
         This is the main method that builds the complete dependency tree
-        by recursively parsing all included files.
+        by parsing all transitively included files.
+
+        The result is memoized per root file. A cached result is reused as long
+        as every parsed file and every dependency target still has the same
+        modification time and size (or is still missing), so calling several
+        reporting methods in a row only walks the tree once. The cached entries
+        are handed out to every caller, so the result is an immutable tuple of
+        frozen DependencyEntry objects. Earlier versions returned a list; callers
+        that append to the result or compare it with a list need to convert it
+        with list() first.
 
         Args:
             root_file: The root LaTeX file to start from (relative to base_path).
                       Defaults to "main.tex".
 
         Returns:
-            List of DependencyEntry objects representing all dependencies found.
+            Tuple of DependencyEntry objects representing all dependencies found.
 
         Examples:
             >>> collector = LatexDependencyCollector("../latex_split_test_project")
@@ -255,14 +654,29 @@ class LatexDependencyCollector:
             15
             >>> tex_files = [d for d in deps if d.is_tex_file and d.exists]
         """
+        cached = self._result_cache.get(root_file)
+        if cached is not None:
+            deps, processed, cycles, signatures = cached
+            if all(self._file_signature(f) == sig for f, sig in signatures.items()):
+                self.dependencies = list(deps)
+                self.processed_files = set(processed)
+                self.cycles = list(cycles)
+                return deps
+
         # Reset state
         self.dependencies = []
         self.processed_files = set()
+        self._stat_cache = {}
 
-        # Start recursive collection
-        self._collect_dependencies_recursive(root_file)
+        # Walk the inclusion tree
+        self._collect_dependencies_iterative(root_file)
+        self.cycles = self._find_cycles(root_file)
 
-        return self.dependencies
+        deps = tuple(self.dependencies)
+        watched = self.processed_files.union(d.file_path for d in deps)
+        signatures = {f: self._file_signature(f) for f in watched}
+        self._result_cache[root_file] = (deps, set(self.processed_files), list(self.cycles), signatures)
+        return deps
 
     def get_dependency_tree(self, root_file: str = "main.tex") -> Dict[str, List[DependencyEntry]]:
         """
@@ -313,20 +727,19 @@ class LatexDependencyCollector:
             pandas DataFrame with columns: file_path, include_type, included_from,
             line_number, exists, is_tex_file. Returns None if pandas not available.
         """
-        if not HAS_PANDAS:
+        pd = get_pandas()
+        if pd is None:
             return None
 
         deps = self.collect_dependencies(root_file)
-        data = [{
-            'file_path': d.file_path,
-            'include_type': d.include_type,
-            'included_from': d.included_from,
-            'line_number': d.line_number,
-            'exists': d.exists,
-            'is_tex_file': d.is_tex_file
-        } for d in deps]
+        columns = ['file_path', 'include_type', 'included_from', 'line_number', 'exists', 'is_tex_file']
+        if not deps:
+            return pd.DataFrame(columns=columns)
 
-        return pd.DataFrame(data)
+        # Transpose entries into one list per column instead of one dict per row
+        values = zip(*((d.file_path, d.include_type, d.included_from,
+                        d.line_number, d.exists, d.is_tex_file) for d in deps))
+        return pd.DataFrame({c: list(v) for c, v in zip(columns, values)})
 
     def print_table(self, root_file: str = "main.tex") -> None:
         """
@@ -344,25 +757,23 @@ class LatexDependencyCollector:
             print("No dependencies found")
             return
 
-        if HAS_PANDAS:
-            df = self.to_dataframe(root_file)
-            if df is not None:
-                print(df.to_string(index=False))
+        df = self.to_dataframe(root_file)
+        if df is not None:
+            print(df.to_string(index=False))
         else:
             # Fallback table printing
             headers = ['file_path', 'include_type', 'included_from', 'line_number', 'exists', 'is_tex_file']
-            col_widths = {h: max(len(str(getattr(d, h))) for d in deps +
-                                 [type('Mock', (), {h: h for h in headers})()]) for h in headers}
+            rows = [(d.file_path, d.include_type, d.included_from,
+                     str(d.line_number), str(d.exists), str(d.is_tex_file)) for d in deps]
 
-            # Print header
-            header_row = ' | '.join(f"{h:<{col_widths[h]}}" for h in headers)
-            print(header_row)
-            print('-' * len(header_row))
+            # Column widths in one pass over the transposed rows
+            col_widths = [max(len(h), max(map(len, col))) for h, col in zip(headers, zip(*rows))]
 
-            # Print data rows
-            for d in deps:
-                row = [str(getattr(d, h)) for h in headers]
-                print(' | '.join(f"{cell:<{col_widths[h]}}" for cell, h in zip(row, headers)))
+            # Build header and data rows, then write them in one call
+            header_row = ' | '.join(f"{h:<{w}}" for h, w in zip(headers, col_widths))
+            lines = [header_row, '-' * len(header_row)]
+            lines.extend(' | '.join(f"{cell:<{w}}" for cell, w in zip(row, col_widths)) for row in rows)
+            print('\n'.join(lines))
 
     def to_networkx_graph(self, root_file: str = "main.tex") -> Optional["nx.DiGraph"]:
         """
@@ -391,21 +802,26 @@ class LatexDependencyCollector:
         deps = self.collect_dependencies(root_file)
         G = nx.DiGraph()
 
+        # Files known to be .tex files, for classifying including files in O(1)
+        tex_files = {d.file_path for d in deps if d.is_tex_file}
+
         # Add root node
         G.add_node(root_file, exists=True, is_tex_file=True, node_type='root')
+        seen_nodes = {root_file}
 
         # Add all dependency nodes and edges
         for dep in deps:
             # Add the included_from node if not already present
-            if dep.included_from not in G:
-                # Check if it's a tex file by looking at existing dependencies
-                is_tex = any(d.file_path == dep.included_from and d.is_tex_file for d in deps)
-                is_tex = is_tex or dep.included_from.endswith('.tex')
+            if dep.included_from not in seen_nodes:
+                is_tex = dep.included_from in tex_files or dep.included_from.endswith('.tex')
                 G.add_node(dep.included_from, exists=True, is_tex_file=is_tex, node_type='tex_file')
+                seen_nodes.add(dep.included_from)
 
             # Add the dependency node
-            node_type = 'tex_file' if dep.is_tex_file else 'other_file'
-            G.add_node(dep.file_path, exists=dep.exists, is_tex_file=dep.is_tex_file, node_type=node_type)
+            if dep.file_path not in seen_nodes:
+                node_type = 'tex_file' if dep.is_tex_file else 'other_file'
+                G.add_node(dep.file_path, exists=dep.exists, is_tex_file=dep.is_tex_file, node_type=node_type)
+                seen_nodes.add(dep.file_path)
 
             # Add the edge
             G.add_edge(dep.included_from, dep.file_path,
@@ -441,19 +857,16 @@ class LatexDependencyCollector:
             print("No graph data available")
             return None
 
-        # Choose layout
-        if layout == "spring":
-            pos = nx.spring_layout(G, seed=42)
-        elif layout == "circular":
-            pos = nx.circular_layout(G)
-        elif layout == "random":
-            pos = nx.random_layout(G, seed=42)
-        elif layout == "shell":
-            pos = nx.shell_layout(G)
-        elif layout == "kamada_kawai":
-            pos = nx.kamada_kawai_layout(G)
+        # Choose layout (unknown names fall back to spring); reuse the positions
+        # if the same graph was laid out last time. Only the latest layout is kept.
+        if layout not in _LAYOUTS:
+            layout = "spring"
+        layout_key = (layout, frozenset(G.nodes), frozenset(G.edges))
+        if self._layout_cache is not None and self._layout_cache[0] == layout_key:
+            pos = self._layout_cache[1]
         else:
-            pos = nx.spring_layout(G, seed=42)
+            pos = _LAYOUTS[layout](G)
+            self._layout_cache = (layout_key, pos)
 
         # Create edge traces
         edge_x = []
@@ -535,8 +948,7 @@ class LatexDependencyCollector:
         # Create the figure
         fig = go.Figure(data=[edge_trace, node_trace],
                        layout=go.Layout(
-                           title=f"LaTeX Dependency Graph - {root_file}",
-                           titlefont_size=16,
+                           title=dict(text=f"LaTeX Dependency Graph - {root_file}", font=dict(size=16)),
                            showlegend=False,
                            hovermode='closest',
                            margin=dict(b=20, l=5, r=5, t=40),
@@ -595,7 +1007,12 @@ class LatexDependencyCollector:
         # Graph properties
         if nx.is_directed(G):
             print(f"\nGraph is directed: Yes")
-            print(f"Is DAG (no cycles): {nx.is_directed_acyclic_graph(G)}")
+            # Cycles were already found while collecting; no second traversal needed
+            print(f"Is DAG (no cycles): {not self.cycles}")
+            for cycle in self.cycles[:3]:
+                print(f"  Cycle: {' -> '.join(cycle)}")
+            if len(self.cycles) > 3:
+                print(f"  ... and {len(self.cycles) - 3} more")
 
             # Find root and leaves
             roots = [node for node in G.nodes() if G.in_degree(node) == 0]
@@ -606,13 +1023,14 @@ class LatexDependencyCollector:
 
         print(f"\nGraph density: {nx.density(G):.4f}")
 
-    def save_dependency_graph_clean(self, root_file: str = "main.tex", output_file: str = "dependency_graph.html") -> bool:
+    def save_dependency_graph_clean(self, root_file: str = "main.tex",
+                                    output_file: Path | str = "dependency_graph.html") -> bool:
         """
         Save the dependency graph as a clean, readable HTML file with separate JS data.
 
         Args:
             root_file: The root LaTeX file to start from (relative to base_path).
-            output_file: The output HTML file path.
+            output_file: The output HTML file path, as a string or Path.
 
         Returns:
             True if successful, False otherwise.
@@ -625,124 +1043,20 @@ class LatexDependencyCollector:
         if fig is None:
             return False
 
-        # Convert figure to JSON
+        # Convert figure to JSON (plotly uses orjson automatically when installed)
         fig_json = fig.to_json()
+        generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-        # Create clean HTML template
-        html_template = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>LaTeX Dependency Graph - {root_file}</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            padding: 20px;
-        }}
-        h1 {{
-            color: #333;
-            text-align: center;
-            margin-bottom: 10px;
-        }}
-        .subtitle {{
-            text-align: center;
-            color: #666;
-            margin-bottom: 30px;
-        }}
-        #graph {{
-            width: 100%;
-            height: 800px;
-        }}
-        .info {{
-            background: #f8f9fa;
-            border-left: 4px solid #007acc;
-            padding: 15px;
-            margin: 20px 0;
-            border-radius: 4px;
-        }}
-        .legend {{
-            display: flex;
-            justify-content: center;
-            gap: 20px;
-            margin: 20px 0;
-            flex-wrap: wrap;
-        }}
-        .legend-item {{
-            display: flex;
-            align-items: center;
-            gap: 5px;
-        }}
-        .legend-color {{
-            width: 16px;
-            height: 16px;
-            border-radius: 50%;
-            display: inline-block;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>LaTeX Dependency Graph</h1>
-        <p class="subtitle">Interactive visualization of file dependencies for {root_file}</p>
-
-        <div class="info">
-            <strong>Graph Statistics:</strong><br>
-            Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br>
-            Root file: {root_file}
-        </div>
-
-        <div class="legend">
-            <div class="legend-item">
-                <span class="legend-color" style="background-color: #FF6B6B;"></span>
-                <span>Root File</span>
-            </div>
-            <div class="legend-item">
-                <span class="legend-color" style="background-color: #4ECDC4;"></span>
-                <span>TeX Files (Existing)</span>
-            </div>
-            <div class="legend-item">
-                <span class="legend-color" style="background-color: #95A5A6;"></span>
-                <span>Missing Files</span>
-            </div>
-            <div class="legend-item">
-                <span class="legend-color" style="background-color: #45B7D1;"></span>
-                <span>Other Files</span>
-            </div>
-        </div>
-
-        <div id="graph"></div>
-    </div>
-
-    <script>
-        // Figure data
-        const figureData = {fig_json};
-
-        // Render the plot
-        Plotly.newPlot('graph', figureData.data, figureData.layout, {{
-            responsive: true,
-            displayModeBar: true,
-            modeBarButtonsToRemove: ['pan2d', 'lasso2d'],
-            displaylogo: false
-        }});
-    </script>
-</body>
-</html>"""
-
+        # Stream the page around the figure data instead of building it in memory
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(html_template)
+            with open(output_file, 'w', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
+                f.write(_HTML_HEADER.format(root_file=root_file, generated=generated))
+                f.write("\n        </div>\n")
+                f.write(_HTML_LEGEND)
+                f.write("\n    <script>\n        // Figure data\n        const figureData = ")
+                f.write(fig_json)
+                f.write(";\n")
+                f.write(_HTML_RENDER)
             print(f"Clean HTML graph saved as '{output_file}'")
             return True
         except Exception as e:
@@ -750,8 +1064,8 @@ class LatexDependencyCollector:
             return False
 
     def save_dependency_graph_separate(self, root_file: str = "main.tex",
-                                     html_file: str = "dependency_graph.html",
-                                     data_file: str = "dependency_graph.json") -> bool:
+                                     html_file: Path | str = "dependency_graph.html",
+                                     data_file: Path | str = "dependency_graph.json") -> bool:
         """
         Save the dependency graph as separate HTML and JSON files for better maintainability.
 
@@ -761,8 +1075,8 @@ class LatexDependencyCollector:
 
         Args:
             root_file: The root LaTeX file to start from (relative to base_path).
-            html_file: The output HTML file path.
-            data_file: The output JSON data file path.
+            html_file: The output HTML file path, as a string or Path.
+            data_file: The output JSON data file path, as a string or Path.
 
         Returns:
             True if successful, False otherwise.
@@ -781,139 +1095,31 @@ class LatexDependencyCollector:
         if fig is None:
             return False
 
-        # Convert figure to JSON
+        # Convert figure to JSON (plotly uses orjson automatically when installed)
         fig_json = fig.to_json()
 
         # Save the data file
         try:
-            with open(data_file, 'w', encoding='utf-8') as f:
+            with open(data_file, 'w', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
                 f.write(fig_json)
             print(f"Graph data saved as '{data_file}'")
         except Exception as e:
             print(f"Error saving data file: {e}")
             return False
 
-        # Create clean HTML template that embeds the data
-        html_template = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>LaTeX Dependency Graph - {root_file}</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            padding: 20px;
-        }}
-        h1 {{
-            color: #333;
-            text-align: center;
-            margin-bottom: 10px;
-        }}
-        .subtitle {{
-            text-align: center;
-            color: #666;
-            margin-bottom: 30px;
-        }}
-        #graph {{
-            width: 100%;
-            height: 800px;
-        }}
-        .info {{
-            background: #f8f9fa;
-            border-left: 4px solid #007acc;
-            padding: 15px;
-            margin: 20px 0;
-            border-radius: 4px;
-        }}
-        .legend {{
-            display: flex;
-            justify-content: center;
-            gap: 20px;
-            margin: 20px 0;
-            flex-wrap: wrap;
-        }}
-        .legend-item {{
-            display: flex;
-            align-items: center;
-            gap: 5px;
-        }}
-        .legend-color {{
-            width: 16px;
-            height: 16px;
-            border-radius: 50%;
-            display: inline-block;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>LaTeX Dependency Graph</h1>
-        <p class="subtitle">Interactive visualization of file dependencies for {root_file}</p>
-
-        <div class="info">
-            <strong>Graph Statistics:</strong><br>
-            Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br>
-            Root file: {root_file}<br>
-            Data source: {data_file}
-        </div>
-
-        <div class="legend">
-            <div class="legend-item">
-                <span class="legend-color" style="background-color: #FF6B6B;"></span>
-                <span>Root File</span>
-            </div>
-            <div class="legend-item">
-                <span class="legend-color" style="background-color: #4ECDC4;"></span>
-                <span>TeX Files (Existing)</span>
-            </div>
-            <div class="legend-item">
-                <span class="legend-color" style="background-color: #95A5A6;"></span>
-                <span>Missing Files</span>
-            </div>
-            <div class="legend-item">
-                <span class="legend-color" style="background-color: #45B7D1;"></span>
-                <span>Other Files</span>
-            </div>
-        </div>
-
-        <div id="graph"></div>
-    </div>
-
-    <script type="application/json" id="graph-data">
-{fig_json}
-    </script>
-
-    <script>
-        // Load graph data from embedded JSON
-        const figureData = JSON.parse(document.getElementById('graph-data').textContent);
-
-        // Render the plot
-        Plotly.newPlot('graph', figureData.data, figureData.layout, {{
-            responsive: true,
-            displayModeBar: true,
-            modeBarButtonsToRemove: ['pan2d', 'lasso2d'],
-            displaylogo: false
-        }});
-    </script>
-</body>
-</html>"""
-
-        # Save the HTML file
+        # Stream the HTML page, embedding the data without building the page in memory
+        generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         try:
-            with open(html_file, 'w', encoding='utf-8') as f:
-                f.write(html_template)
+            with open(html_file, 'w', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
+                f.write(_HTML_HEADER.format(root_file=root_file, generated=generated))
+                f.write(f"<br>\n            Data source: {data_file}\n        </div>\n")
+                f.write(_HTML_LEGEND)
+                f.write('\n    <script type="application/json" id="graph-data">\n')
+                f.write(fig_json)
+                f.write("\n    </script>\n\n    <script>\n"
+                        "        // Load graph data from embedded JSON\n"
+                        "        const figureData = JSON.parse(document.getElementById('graph-data').textContent);\n")
+                f.write(_HTML_RENDER)
             print(f"HTML template saved as '{html_file}'")
             return True
         except Exception as e:
@@ -1,18 +1,25 @@
 from __future__ import annotations
+import errno
+import mmap
+import os
+import pickle
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, List, Dict, Tuple, Set
+from typing import Iterator, Optional, List, Dict, Tuple, Set
 
 try:
-    import pandas as pd
-    HAS_PANDAS = True
+    import regex
+    HAS_REGEX = True
 except (ImportError, ValueError, Exception):
-    HAS_PANDAS = False
+    HAS_REGEX = False
 
-from dependency_collector import DependencyEntry, LatexDependencyCollector
+from dependency_collector import DependencyEntry, LatexDependencyCollector, get_pandas
 
-@dataclass
+@dataclass(slots=True)
 class TocEntry:
     """
     Represents a single entry from a LaTeX table of contents.
@@ -78,12 +85,25 @@ class LatexTocProcessor:
     
     Attributes:
         base_path (Path): Base directory path where input files are located.
+        cache_dir (Optional[Path]): Directory for pickled process() results, or
+                                    None to disable the on-disk cache.
         entries (List[TocEntry]): List of parsed TOC entries. Populated after
                                   calling process() or parse_toc().
+        _parse_cache (Dict[Tuple[str, str], Tuple[Tuple[int, int], object]]):
+                                  Parse results per (kind, path), validated
+                                  against (st_mtime_ns, st_size).
         NUMBERLINE_RE: Compiled regex pattern for matching \\numberline commands.
         SECID_RE: Compiled regex pattern for matching [secid=N] markers.
         AUX_NEWLABEL_RE: Compiled regex pattern for matching \\newlabel commands.
-        SECTPOS_RE: Compiled regex pattern for matching secid file entries.
+        TOC_ENTRY_RE: Compiled regex pattern matching a whole \\contentsline line
+                      with all of its fields in one pass.
+        CONTENTSLINE_PREFIX_RE: Compiled regex pattern for the leading \\contentsline
+                                of a TOC line.
+        CONTENTSLINE_RE: Compiled regex pattern for the common, shallowly nested
+                         form of \\contentsline lines.
+        COLUMNS: Keys of the dictionaries returned by process(), in display order.
+        BRACE_END_RE: Compiled regex module pattern for the remainder of a balanced
+                      brace group, or None when regex is not installed.
     
     Examples:
         Basic usage:
@@ -102,15 +122,64 @@ class LatexTocProcessor:
     """
     
     # Regex patterns for parsing
-    NUMBERLINE_RE = re.compile(r"""\\numberline\s*\{(?P<num>[^}]+)\}(?P<title>.*)""", re.DOTALL)
+    NUMBERLINE_RE = re.compile(r"""\\numberline\s*\{(?P<num>[^}]+)\}(?P<title>.*)""")
     SECID_RE = re.compile(r"""\[secid=(?P<secid>\d+)\]""")
+    # The .aux file is scanned as bytes over the whole buffer; only the
+    # captured groups get decoded. Number, page and title are not captured,
+    # so findall() yields (label_name, label_ref) pairs directly.
     AUX_NEWLABEL_RE = re.compile(
-        r"""\\newlabel\{(?P<label_name>[^}]+)\}\{\{(?P<num>[^}]*)\}\{(?P<page>[^}]*)\}\{(?P<title>[^}]*)\}\{(?P<label_ref>[^}]*)\}""",
-        re.DOTALL,
+        rb"""\\newlabel\{(?P<label_name>[^}]+)\}\{\{[^}]*\}\{[^}]*\}\{[^}]*\}\{(?P<label_ref>[^}]*)\}"""
+    )
+    # One pass per \contentsline line: level, the leading [secid=N] marker that
+    # secid.sty prepends, \numberline{num}, title, page and optional label are
+    # captured together. Lines the fused branch cannot take verbatim fall
+    # through to the ``raw`` alternative and go through _parse_toc_line.
+    # It runs over the decoded text with the lines joined by \n, so [^\S\n]
+    # is any blank within a line. Fields are captured with their padding and
+    # stripped afterwards. No two adjacent quantifiers can both match a blank
+    # (the title has to start on a non-blank), so a padded or malformed line
+    # fails in linear time instead of trying every split of a blank run
+    # between trim and capture.
+    TOC_ENTRY_RE = re.compile(
+        r"""^[^\S\n]*\\contentsline(?:"""
+        r"""[^\S\n]*\{(?P<level>[^{}\n]*)\}"""
+        r"""[^\S\n]*\{[^\S\n]*(?:\[secid=(?P<secid>\d+)\][^\S\n]*)?"""
+        r"""(?:\\numberline[^\S\n]*\{(?=[^}])(?P<num>[^{}\n]*)\}[^\S\n]*)?"""
+        r"""(?P<title>(?:[^{}\s]|\{[^{}\n]*\})(?:[^{}\n]|\{[^{}\n]*\})*|)\}"""
+        r"""[^\S\n]*\{(?P<page>[^{}\n]*)\}"""
+        r"""(?:[^\S\n]*\{(?P<label_ref>[^{}\n]*)\}"""
+        r"""|(?=[^{\n]*$))"""
+        r"""|(?P<raw>.*))""",
+        re.MULTILINE,
+    )
+    # Prefix check for the brace-walking fallback; avoids stripping the line.
+    CONTENTSLINE_PREFIX_RE = re.compile(r"""\s*\\contentsline""")
+    # Fast path for \contentsline{level}{body}{page}{label} where the body nests
+    # braces at most one level deep (e.g. \numberline{1.1}). The label is either
+    # a flat group or absent with no further '{' on the line; anything else is
+    # left to the brace walker in _parse_toc_line.
+    CONTENTSLINE_RE = re.compile(
+        r"""\s*\\contentsline\s*\{(?P<level>[^{}]*)\}"""
+        r"""\s*\{(?P<body>(?:[^{}]|\{[^{}]*\})*)\}"""
+        r"""\s*\{(?P<page>[^{}]*)\}"""
+        r"""(?:\s*\{(?P<label_ref>[^{}]*)\}|(?=[^{]*$))"""
+    )
+    
+    # With the third-party regex module, the rest of a brace group (plain runs
+    # and recursively balanced {...} groups up to the closing '}') is matched
+    # in one call instead of walked in Python.
+    BRACE_END_RE = (
+        regex.compile(r"""(?:[^{}]++|(\{(?:[^{}]++|(?1))*+\}))*+\}""") if HAS_REGEX else None
     )
-    SECTPOS_RE = re.compile(r"""^(?P<secid>\d+)\|(?P<file>[^|]+)\|(?P<line>\d+)\s*$""")
     
-    def __init__(self, base_path: Path | str):
+    # Keys of the dictionaries returned by process(), in display order
+    COLUMNS = ('number', 'level', 'page', 'file', 'line', 'label', 'title')
+    
+    # Files at least this large are mapped read-only instead of copied into
+    # a bytes object before scanning.
+    MMAP_MIN_BYTES = 1 << 20
+
+    def __init__(self, base_path: Path | str, cache_dir: Optional[Path | str] = None):
         """
         Initialize the processor with a base path.
         
@@ -118,6 +187,11 @@ class LatexTocProcessor:
             base_path: Base directory path where TOC, secid, and aux files are located.
                       Can be a string or Path object. All file operations will be
                       relative to this path.
+            cache_dir: Optional directory for a pickled copy of process() results.
+                      When set, process() skips parsing entirely while the
+                      TOC, secid and aux files are unchanged since the pickle
+                      was written, even across interpreter runs. Defaults to
+                      None (no on-disk cache).
         
         Raises:
             TypeError: If base_path cannot be converted to a Path.
@@ -125,9 +199,68 @@ class LatexTocProcessor:
         Examples:
             >>> processor = LatexTocProcessor("/path/to/latex/files")
             >>> processor = LatexTocProcessor(Path("snippets"))
+            >>> processor = LatexTocProcessor("snippets", cache_dir="snippets/.cache")
         """
         self.base_path = Path(base_path)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
         self.entries: List[TocEntry] = []
+        self._parse_cache: Dict[Tuple[str, str], Tuple[Tuple[int, int], object]] = {}
+
+    def clear_cache(self) -> None:
+        """
+        Drop all cached .toc, .aux and .secid parse results.
+
+        Files are re-validated by (st_mtime_ns, st_size) on every call, so this
+        is only needed when a file may have been rewritten without either
+        changing.
+        """
+        self._parse_cache.clear()
+
+    def _cache_get(self, key: Tuple[str, str], signature: Tuple[int, int]) -> Optional[object]:
+        """
+        Return the cached parse result for key if its file signature still matches.
+        """
+        cached = self._parse_cache.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        return None
+
+    @staticmethod
+    def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+        """
+        Return (st_mtime_ns, st_size) for a file, or None if it doesn't exist.
+        """
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load_processed(self, cache_file: Path, key: tuple) -> Optional[List[TocEntry]]:
+        """
+        Return the enriched entries from a pickle written for the same key.
+        
+        A missing, unreadable or stale pickle counts as a miss.
+        """
+        try:
+            stored_key, entries = pickle.loads(cache_file.read_bytes())
+        except Exception:
+            return None
+        if stored_key != key:
+            return None
+        return entries
+
+    def _store_processed(self, cache_file: Path, key: tuple, entries: List[TocEntry]) -> None:
+        """
+        Pickle enriched entries next to their key; failures only cost the cache.
+        """
+        tmp_file = cache_file.with_name(cache_file.name + ".tmp")
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file.write_bytes(pickle.dumps((key, entries), protocol=pickle.HIGHEST_PROTOCOL))
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
     
     @staticmethod
     def _tex_unbrace(s: str) -> str:
@@ -175,15 +308,29 @@ class LatexTocProcessor:
             >>> text[16:end+1]  # Extract the matched content
             'chapter'
         """
+        if HAS_REGEX:
+            m = LatexTocProcessor.BRACE_END_RE.match(text, start)
+            return m.end() - 1 if m else -1
+        
+        # Jump between brace positions with str.find instead of visiting
+        # every character; TOC bodies contain only a handful of braces.
         depth = 1
         i = start
-        while i < len(text) and depth > 0:
-            if text[i] == '{':
+        find = text.find
+        nxo = find('{', i)
+        while True:
+            nxc = find('}', i)
+            if nxc == -1:
+                return -1
+            if nxo != -1 and nxo < nxc:
                 depth += 1
-            elif text[i] == '}':
+                i = nxo + 1
+                nxo = find('{', i)
+            else:
                 depth -= 1
-            i += 1
-        return i - 1 if depth == 0 else -1
+                if depth == 0:
+                    return nxc
+                i = nxc + 1
     
     def _parse_toc_line(self, line: str) -> Optional[Tuple[str, str, str, Optional[str]]]:
         r"""
@@ -192,8 +339,10 @@ class LatexTocProcessor:
         This method parses a LaTeX \\contentsline command which has the format:
         \\contentsline{level}{body}{page}{label}
         
-        The method uses brace matching to correctly handle nested braces in the
-        body argument (e.g., \numberline{1.1}Title with nested braces).
+        Lines whose arguments nest braces at most one level deep (the usual
+        case, e.g. \numberline{1.1}Title) are matched with CONTENTSLINE_RE in a
+        single regex call. Other lines fall back to brace matching, which
+        handles arbitrarily nested braces in the body argument.
         
         Args:
             line: A single line from the TOC file containing a \\contentsline command.
@@ -213,13 +362,24 @@ class LatexTocProcessor:
             >>> result[0]  # level
             'chapter'
         """
+        # Both patterns below need the command name, so reject other lines
+        # with a substring test (startswith would miss leading whitespace)
+        if "\\contentsline" not in line:
+            return None
+
+        # Fast path: one regex call for the common shallow form
+        m = self.CONTENTSLINE_RE.match(line)
+        if m:
+            return m.group('level', 'body', 'page', 'label_ref')
+
         # Match \contentsline {level}{body}{page}{label}
         # We need to find the boundaries by counting braces
-        if not line.strip().startswith('\\contentsline'):
+        prefix = self.CONTENTSLINE_PREFIX_RE.match(line)
+        if prefix is None:
             return None
         
         # Find the opening brace after \contentsline
-        start = line.find('{')
+        start = line.find('{', prefix.end())
         if start == -1:
             return None
         
@@ -257,6 +417,88 @@ class LatexTocProcessor:
         
         return (level, body, page, label_ref)
     
+    @classmethod
+    @contextmanager
+    def _read_buffer(cls, path: Path) -> Iterator[bytes | mmap.mmap]:
+        """
+        Yield the raw contents of a file for byte-mode regex scanning.
+        
+        Files of at least MMAP_MIN_BYTES are memory-mapped read-only so the
+        scanners work on the page cache directly; smaller (and empty) files are
+        simply read into a bytes object. The map is closed when the block
+        exits, so matches must be consumed inside it.
+        
+        Args:
+            path: Path of the file to read.
+        
+        Yields:
+            The file contents as bytes or a read-only mmap.
+        
+        Raises:
+            FileNotFoundError: If the file doesn't exist.
+        """
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0 or size < cls.MMAP_MIN_BYTES:
+                yield f.read()
+                return
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield buf
+            finally:
+                buf.close()
+
+    def _toc_entry_from_line(self, line: str) -> Optional[TocEntry]:
+        """
+        Build a TocEntry from a single \\contentsline line the slow way.
+        
+        Used by parse_toc for the lines that TOC_ENTRY_RE cannot capture in one
+        pass (bodies nested deeper than one brace level, [secid=N] markers that
+        are not at the start of the body, and similar oddities).
+        
+        Args:
+            line (str): A line from the .toc file.
+        
+        Returns:
+            Optional[TocEntry]: The parsed entry, or None if the line is not a
+                                valid \\contentsline.
+        """
+        result = self._parse_toc_line(line)
+        if result is None:
+            return None
+        level, body, page, label_ref = result
+        
+        level = sys.intern(level.strip())
+        body = body.strip()
+        page = page.strip()
+        if len(page) < 8:
+            page = sys.intern(page)
+        label_ref = label_ref.strip() if label_ref else None
+
+        # Extract secid if present
+        secid = None
+        secid_match = self.SECID_RE.search(body)
+        if secid_match:
+            secid = int(secid_match.group("secid"))
+            # Remove secid marker from body by slicing around the match
+            body = body[:secid_match.start()] + body[secid_match.end():]
+            if '[secid=' in body:
+                # Rare: further markers in the same body
+                body = self.SECID_RE.sub("", body)
+            body = body.strip()
+
+        num = None
+        title = body
+        mn = self.NUMBERLINE_RE.match(body)
+        if mn:
+            num = mn.group("num").strip()
+            title = mn.group("title").strip()
+
+        # very light cleanup
+        title = self._tex_unbrace(title)
+
+        return TocEntry(level=level, number=num, title=title, page=page, label_ref=label_ref, secid=secid)
+
     def parse_toc(self, toc_path: Path | str) -> List[TocEntry]:
         """
         Parse TOC file and return list of TocEntry objects.
@@ -294,38 +536,52 @@ class LatexTocProcessor:
             'Introduction'
         """
         toc_path = Path(toc_path)
-        text = toc_path.read_text(encoding="utf-8", errors="replace")
+        st = toc_path.stat()
+        signature = (st.st_mtime_ns, st.st_size)
+        key = ("toc", str(toc_path))
+        cached = self._cache_get(key, signature)
+        if cached is not None:
+            # Entries are enriched in place later on, so hand out fresh ones
+            return [TocEntry(*fields) for fields in cached]
+
         entries: List[TocEntry] = []
-        for line in text.splitlines():
-            result = self._parse_toc_line(line)
-            if result is None:
+        # Bound once; the loop below runs per \contentsline line
+        append = entries.append
+        make_entry = TocEntry
+        unbrace = self._tex_unbrace
+        intern = sys.intern
+        # Decode once and split the way the line-by-line parser did, so every
+        # line break str.splitlines() knows ends a line; joined with \n, the
+        # whole text is then scanned in a single finditer()
+        text = toc_path.read_bytes().decode("utf-8", errors="replace")
+        text = "\n".join(text.splitlines())
+        for m in self.TOC_ENTRY_RE.finditer(text):
+            # One groups() call instead of a lookup per named group;
+            # the order follows the groups in TOC_ENTRY_RE
+            level, secid, num, title, page, label_ref, _ = m.groups()
+            if not (title is None or "[secid=" in title
+                    or (num is None and "\\numberline" in title)):
+                level = level.strip()
+                page = page.strip()
+                # Levels come from a small fixed set and short page numbers
+                # repeat across the TOC, so share one string object for each
+                append(make_entry(
+                    level=intern(level),
+                    number=num.strip() if num is not None else None,
+                    title=unbrace(title),
+                    page=intern(page) if len(page) < 8 else page,
+                    # An empty label group ({}) means no label
+                    label_ref=label_ref.strip() if label_ref else None,
+                    secid=int(secid) if secid is not None else None,
+                ))
                 continue
-            level, body, page, label_ref = result
-            
-            level = level.strip()
-            body = body.strip()
-            page = page.strip()
-            label_ref = label_ref.strip() if label_ref else None
-
-            # Extract secid if present
-            secid = None
-            secid_match = self.SECID_RE.search(body)
-            if secid_match:
-                secid = int(secid_match.group("secid"))
-                # Remove secid marker from body
-                body = self.SECID_RE.sub("", body).strip()
-
-            num = None
-            title = body
-            mn = self.NUMBERLINE_RE.match(body)
-            if mn:
-                num = mn.group("num").strip()
-                title = mn.group("title").strip()
-
-            # very light cleanup
-            title = self._tex_unbrace(title)
-
-            entries.append(TocEntry(level=level, number=num, title=title, page=page, label_ref=label_ref, secid=secid))
+            # Deeper nesting or markers away from the start of the body
+            entry = self._toc_entry_from_line(m.group())
+            if entry is not None:
+                append(entry)
+        self._parse_cache[key] = (signature, tuple(
+            (e.level, e.number, e.title, e.page, e.label_ref, e.label_name, e.secid) for e in entries
+        ))
         return entries
 
     def parse_aux_labels(self, aux_path: Path | str) -> Dict[str, str]:
@@ -360,13 +616,31 @@ class LatexTocProcessor:
             'chap:intro'
         """
         aux_path = Path(aux_path)
-        text = aux_path.read_text(encoding="utf-8", errors="replace")
+        st = aux_path.stat()
+        signature = (st.st_mtime_ns, st.st_size)
+        key = ("aux", str(aux_path))
+        cached = self._cache_get(key, signature)
+        if cached is not None:
+            return dict(cached)
+
         out: Dict[str, str] = {}  # label_ref -> label_name
-        for m in self.AUX_NEWLABEL_RE.finditer(text):
-            label_name = m.group("label_name").strip()
-            label_ref = m.group("label_ref").strip()
-            if label_ref:
-                out[label_ref] = label_name
+        with self._read_buffer(aux_path) as buf:
+            # Match text-mode reading, which turns \r\n and a lone \r into \n;
+            # it only shows in names that span lines
+            if buf.find(b"\r") != -1:
+                buf = buf[:].replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+            for label_name, label_ref in self.AUX_NEWLABEL_RE.findall(buf):
+                # Strict decoding first; it is much cheaper than errors="replace".
+                # Strip after decoding so Unicode blanks such as U+00A0 go too.
+                try:
+                    ref, name = label_ref.decode(), label_name.decode()
+                except UnicodeDecodeError:
+                    ref = label_ref.decode("utf-8", errors="replace")
+                    name = label_name.decode("utf-8", errors="replace")
+                ref = ref.strip()
+                if ref:
+                    out[ref] = name.strip()
+        self._parse_cache[key] = (signature, dict(out))
         return out
 
     def parse_sectpos(self, sectpos_path: Path | str) -> Dict[int, Tuple[str, int]]:
@@ -407,12 +681,27 @@ class LatexTocProcessor:
         out: Dict[int, Tuple[str, int]] = {}
         if not sectpos_path.exists():
             return out
-        for line in sectpos_path.read_text(encoding="utf-8", errors="replace").splitlines():
-            m = self.SECTPOS_RE.match(line)
-            if not m:
+        st = sectpos_path.stat()
+        signature = (st.st_mtime_ns, st.st_size)
+        key = ("secid", str(sectpos_path))
+        cached = self._cache_get(key, signature)
+        if cached is not None:
+            return dict(cached)
+
+        text = sectpos_path.read_bytes().decode("utf-8", errors="replace")
+        # Each row is <secid>|<file>|<line>; split it rather than running a
+        # regex. Rows that don't have exactly three fields, or whose secid or
+        # line is not all digits, are skipped. Trailing blanks are allowed,
+        # leading ones make the row invalid.
+        for line in text.splitlines():
+            fields = line.split("|")
+            if len(fields) != 3:
                 continue
-            secid = int(m.group("secid"))
-            out[secid] = (m.group("file"), int(m.group("line")))
+            secid, file, lineno = fields
+            lineno = lineno.rstrip()
+            if file and secid.isdecimal() and lineno.isdecimal():
+                out[int(secid)] = (file, int(lineno))
+        self._parse_cache[key] = (signature, dict(out))
         return out
 
     def _attach_positions(self, entries: List[TocEntry], posmap: Dict[int, Tuple[str, int]]) -> None:
@@ -440,9 +729,15 @@ class LatexTocProcessor:
             >>> entries[0].line
             20
         """
+        if not posmap:
+            return
+        get = posmap.get
         for e in entries:
-            if e.secid is not None and e.secid in posmap:
-                e.file, e.line = posmap[e.secid]
+            if e.secid is None:
+                continue
+            hit = get(e.secid)
+            if hit is not None:
+                e.file, e.line = hit
 
     def _attach_labels(self, entries: List[TocEntry], labelmap: Dict[str, str]) -> None:
         """
@@ -468,9 +763,133 @@ class LatexTocProcessor:
             >>> entries[0].label_name
             'chap:intro'
         """
+        if not labelmap:
+            return
+        get = labelmap.get
         for e in entries:
-            if e.label_ref and e.label_ref in labelmap:
-                e.label_name = labelmap[e.label_ref]
+            if e.label_ref:
+                label_name = get(e.label_ref)
+                if label_name is not None:
+                    e.label_name = label_name
+
+    def _attach_positions_and_labels(self, entries: List[TocEntry], posmap: Dict[int, Tuple[str, int]],
+                                     labelmap: Dict[str, str]) -> None:
+        """
+        Enrich entries with positions and labels in a single pass.
+        
+        Equivalent to calling _attach_positions() and then _attach_labels(),
+        but walks the entries once.
+        
+        Args:
+            entries: List of TocEntry objects to enrich. Modified in-place.
+            posmap: Dictionary mapping secid (int) to (filename, line_number) tuples.
+            labelmap: Dictionary mapping label_ref to label_name.
+        """
+        # Without a secid file (or labels) only one of the lookups can hit
+        if not posmap:
+            self._attach_labels(entries, labelmap)
+            return
+        if not labelmap:
+            self._attach_positions(entries, posmap)
+            return
+        get_pos = posmap.get
+        get_label = labelmap.get
+        for e in entries:
+            if e.secid is not None:
+                hit = get_pos(e.secid)
+                if hit is not None:
+                    e.file, e.line = hit
+            if e.label_ref:
+                label_name = get_label(e.label_ref)
+                if label_name is not None:
+                    e.label_name = label_name
+
+    def _load_entries(self, toc_filename: str, secid_filename: str, aux_filename: str) -> List[TocEntry]:
+        """
+        Parse the three input files and return entries enriched with positions and labels.
+        
+        Also stores the entries in self.entries. When cache_dir is set, the
+        enriched entries are served from (and written to) the on-disk cache.
+        """
+        toc_path = self.base_path / toc_filename
+        secid_path = self.base_path / secid_filename
+        aux_path = self.base_path / aux_filename
+        
+        # One stat per input up front: it decides what to parse and keys the
+        # on-disk cache. The TOC and aux files are required; report a missing
+        # one before any work is scheduled (TOC first, as before).
+        toc_sig, secid_sig, aux_sig = map(self._file_signature, (toc_path, secid_path, aux_path))
+        for path, signature in ((toc_path, toc_sig), (aux_path, aux_sig)):
+            if signature is None:
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), str(path))
+        
+        # Serve the entries from the on-disk cache if none of the inputs
+        # changed since it was written
+        cache_file = key = None
+        if self.cache_dir is not None:
+            cache_file = self.cache_dir / f"{Path(toc_filename).stem}.tocparsed.pkl"
+            key = (str(self.base_path),
+                   (str(toc_path), toc_sig), (str(secid_path), secid_sig), (str(aux_path), aux_sig))
+            hit = self._load_processed(cache_file, key)
+            if hit is not None:
+                self.entries = hit
+                return hit
+        
+        # Parse the files; they are independent, so read and scan them
+        # concurrently. The secid file is optional and skipped when absent.
+        # Results are collected in the original order so the same error
+        # surfaces first when several files fail.
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            toc_future = executor.submit(self.parse_toc, toc_path)
+            pos_future = executor.submit(self.parse_sectpos, secid_path) if secid_sig is not None else None
+            label_future = executor.submit(self.parse_aux_labels, aux_path)
+            self.entries = toc_future.result()
+            posmap = pos_future.result() if pos_future is not None else {}
+            labelmap = label_future.result()
+        
+        # Attach positions and labels
+        self._attach_positions_and_labels(self.entries, posmap, labelmap)
+        
+        if cache_file is not None:
+            self._store_processed(cache_file, key, self.entries)
+        return self.entries
+
+    def _entry_row(self, e: TocEntry) -> Tuple:
+        """
+        Return the output values of an entry in COLUMNS order.
+        """
+        # Preserve relative path if available, otherwise use filename
+        file_path = None
+        if e.file:
+            # Normalize path separators to forward slashes for consistency
+            file_path = e.file.replace('\\', '/')
+            # If it's an absolute path, try to make it relative to base_path.
+            # The string check keeps the common relative case free of Path objects.
+            if os.path.isabs(file_path):
+                try:
+                    file_path = str(Path(file_path).relative_to(self.base_path)).replace('\\', '/')
+                except ValueError:
+                    # If not relative to base_path, keep as-is
+                    pass
+        
+        return (e.number if e.number else '*', e.level, e.page, file_path, e.line, e.label_name, e.title)
+
+    def _process_columns(self, toc_filename: str = "test.toc", secid_filename: str = "test.secid",
+                         aux_filename: str = "test.aux") -> Dict[str, list]:
+        """
+        Process all files and return the same data as process(), one list per column.
+        
+        Columnar input lets pandas build each DataFrame column directly
+        instead of inferring the schema from a list of dicts.
+        
+        Returns:
+            A dictionary mapping every name in COLUMNS to a list of values,
+            one per TOC entry (empty lists if there are no entries).
+        """
+        rows = [self._entry_row(e) for e in self._load_entries(toc_filename, secid_filename, aux_filename)]
+        if not rows:
+            return {c: [] for c in self.COLUMNS}
+        return {c: list(values) for c, values in zip(self.COLUMNS, zip(*rows))}
 
     def process(self, toc_filename: str = "test.toc", secid_filename: str = "test.secid", aux_filename: str = "test.aux") -> List[Dict]:
         """
@@ -518,46 +937,45 @@ class LatexTocProcessor:
             >>> data[0]['label']
             'chap:intro'
         """
-        # Parse all files
-        self.entries = self.parse_toc(self.base_path / toc_filename)
-        posmap = self.parse_sectpos(self.base_path / secid_filename)
-        labelmap = self.parse_aux_labels(self.base_path / aux_filename)
+        return [dict(zip(self.COLUMNS, self._entry_row(e)))
+                for e in self._load_entries(toc_filename, secid_filename, aux_filename)]
+    
+    @classmethod
+    def process_many(cls, base_paths: List[Path | str], toc_filename: str = "test.toc",
+                     secid_filename: str = "test.secid", aux_filename: str = "test.aux",
+                     max_workers: Optional[int] = None) -> List[List[Dict]]:
+        """
+        Process several independent documents in parallel worker processes.
         
-        # Attach positions and labels
-        self._attach_positions(self.entries, posmap)
-        self._attach_labels(self.entries, labelmap)
-
-        # Convert to list of dicts
-        data = []
-        for e in self.entries:
-            # Preserve relative path if available, otherwise use filename
-            file_path = None
-            if e.file:
-                # Normalize path separators to forward slashes for consistency
-                file_path = e.file.replace('\\', '/')
-                # If it's an absolute path, try to make it relative to base_path
-                try:
-                    abs_path = Path(file_path)
-                    if abs_path.is_absolute():
-                        try:
-                            file_path = str(abs_path.relative_to(self.base_path)).replace('\\', '/')
-                        except ValueError:
-                            # If not relative to base_path, keep as-is
-                            pass
-                except Exception:
-                    # If path parsing fails, keep original
-                    pass
-            
-            data.append({
-                'number': e.number if e.number else '*',
-                'level': e.level,
-                'page': e.page,
-                'file': file_path,
-                'line': e.line,
-                'label': e.label_name,
-                'title': e.title
-            })
-        return data
+        Each base path is handled by its own processor in a separate process,
+        so the parsing of different documents runs on multiple cores.
+        
+        Args:
+            base_paths: Base directories of the documents to process.
+            toc_filename: Name of the TOC file in every base path. Defaults to "test.toc".
+            secid_filename: Name of the secid file in every base path. Defaults to "test.secid".
+            aux_filename: Name of the aux file in every base path. Defaults to "test.aux".
+            max_workers: Maximum number of worker processes. Defaults to the
+                         ProcessPoolExecutor default (number of CPUs).
+        
+        Returns:
+            One process() result per base path, in the same order.
+        
+        Raises:
+            FileNotFoundError: If a TOC or aux file is missing in any base path.
+        
+        Examples:
+            >>> results = LatexTocProcessor.process_many(["book1", "book2"], "main.toc", "main.secid", "main.aux")
+            >>> len(results)
+            2
+        """
+        base_paths = [str(p) for p in base_paths]
+        if not base_paths:
+            return []
+        n = len(base_paths)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_process_document, base_paths,
+                                     [toc_filename] * n, [secid_filename] * n, [aux_filename] * n))
     
     def process_filtered(self, toc_filename: str = "test.toc", secid_filename: str = "test.secid", 
                         aux_filename: str = "test.aux", exclude_levels: Optional[List[str]] = None) -> List[Dict]:
@@ -587,9 +1005,11 @@ class LatexTocProcessor:
         if exclude_levels is None:
             exclude_levels = ['subsection']
         
-        all_data = self.process(toc_filename, secid_filename, aux_filename)
-        filtered_data = [e for e in all_data if e['level'] not in exclude_levels]
-        return filtered_data
+        # Drop excluded entries before their output dictionaries are built
+        excluded = set(exclude_levels)
+        return [dict(zip(self.COLUMNS, self._entry_row(e)))
+                for e in self._load_entries(toc_filename, secid_filename, aux_filename)
+                if e.level not in excluded]
     
     def split_project(self, output_dir: Path | str,
                       toc_filename: str = "main.toc",
@@ -658,18 +1078,61 @@ class LatexTocProcessor:
             >>> df[df['level'] == 'chapter']
             >>> df.to_csv('toc_export.csv')
         """
-        if not HAS_PANDAS:
+        pd = get_pandas()
+        if pd is None:
             return None
-        data = self.process(toc_filename, secid_filename, aux_filename)
-        return pd.DataFrame(data)
+        return pd.DataFrame(self._process_columns(toc_filename, secid_filename, aux_filename))
+    
+    def format_table(self, toc_filename: str = "test.toc", secid_filename: str = "test.secid",
+                     aux_filename: str = "test.aux") -> str:
+        """
+        Process files and return the results as a formatted table.
+        
+        Uses pandas DataFrame formatting if available, otherwise a custom
+        table formatter with a header row, a dashed rule and one row per entry.
+        
+        Args:
+            toc_filename: Name of the TOC file (relative to base_path).
+                         Defaults to "test.toc".
+            secid_filename: Name of the secid file (relative to base_path).
+                           Defaults to "test.secid".
+            aux_filename: Name of the aux file (relative to base_path).
+                         Defaults to "test.aux".
+        
+        Returns:
+            The table as a string without a trailing newline, or
+            "No data to display" when the TOC has no entries.
+        """
+        pd = get_pandas()
+        if pd is not None:
+            columns = self._process_columns(toc_filename, secid_filename, aux_filename)
+            if not columns['title']:
+                return "No data to display"
+            return pd.DataFrame(columns).to_string(index=False)
+        
+        # Fallback: formatted table
+        rows = [tuple(map(str, self._entry_row(e)))
+                for e in self._load_entries(toc_filename, secid_filename, aux_filename)]
+        if not rows:
+            return "No data to display"
+        
+        # Column widths in one pass over the transposed rows
+        col_widths = [max(len(h), max(map(len, col))) for h, col in zip(self.COLUMNS, zip(*rows))]
+        
+        # Build header and data rows, then join them once
+        header_row = ' | '.join(f"{h:<{w}}" for h, w in zip(self.COLUMNS, col_widths))
+        lines = [header_row, '-' * len(header_row)]
+        lines.extend(' | '.join(f"{cell:<{w}}" for cell, w in zip(row, col_widths)) for row in rows)
+        return '\n'.join(lines)
     
     def print_table(self, toc_filename: str = "test.toc", secid_filename: str = "test.secid", aux_filename: str = "test.aux"):
         """
         Process files and print a formatted table to stdout.
         
         This method processes all input files and displays the results as a
-        nicely formatted table. It automatically uses pandas DataFrame formatting
-        if available, otherwise falls back to a custom table formatter.
+        nicely formatted table, as built by format_table(). It automatically
+        uses pandas DataFrame formatting if available, otherwise falls back to
+        a custom table formatter.
         
         Args:
             toc_filename: Name of the TOC file (relative to base_path).
@@ -688,30 +1151,13 @@ class LatexTocProcessor:
             number | level      | page | file     | line | label                    | title
             ...
         """
-        data = self.process(toc_filename, secid_filename, aux_filename)
-        
-        if HAS_PANDAS:
-            df = pd.DataFrame(data)
-            print(df.to_string(index=False))
-        else:
-            # Fallback: print as formatted table
-            if not data:
-                print("No data to display")
-            else:
-                # Print header
-                headers = ['number', 'level', 'page', 'file', 'line', 'label', 'title']
-                col_widths = {h: max(len(str(row.get(h, ''))) for row in data + [dict(zip(headers, headers))]) 
-                             for h in headers}
-                col_widths = {h: max(col_widths[h], len(h)) for h in headers}
-                
-                # Print header
-                header_row = ' | '.join(f"{h:<{col_widths[h]}}" for h in headers)
-                print(header_row)
-                print('-' * len(header_row))
-                
-                # Print data rows
-                for row in data:
-                    print(' | '.join(f"{str(row.get(h, '')):<{col_widths[h]}}" for h in headers))
+        print(self.format_table(toc_filename, secid_filename, aux_filename))
+
+def _process_document(base_path: str, toc_filename: str, secid_filename: str, aux_filename: str) -> List[Dict]:
+    """
+    Worker for LatexTocProcessor.process_many; must be module-level to be picklable.
+    """
+    return LatexTocProcessor(base_path).process(toc_filename, secid_filename, aux_filename)
 
 if __name__ == "__main__":
     import sys
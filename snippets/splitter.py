@@ -5,9 +5,21 @@ This module provides functionality to split a LaTeX project into separate files
 based on chapters and sections, using information extracted from TOC, secid, and aux files.
 """
 from __future__ import annotations
+import io
+import os
 import re
+import sys
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
+
+# Hierarchy rank of each sectioning level (lower is higher up); other levels rank 99
+_LEVEL_HIERARCHY = {'chapter': 1, 'section': 2, 'subsection': 3}
+
+# Whether filesystems here are case-sensitive by default. On Windows and macOS
+# rglob(name) also finds entries whose name differs from name only in case,
+# which an exact-name index cannot reproduce, so recursive searches there
+# always go through rglob().
+_CASE_SENSITIVE_FS = sys.platform not in ('win32', 'cygwin', 'darwin')
 
 
 class LatexProjectSplitter:
@@ -20,6 +32,14 @@ class LatexProjectSplitter:
     
     Attributes:
         base_path (Path): Base directory path where LaTeX source files are located.
+        _file_cache (Dict[Path, List[str]]): Lines of the source files read during
+                                             the current split(), keyed by path.
+        _path_cache (Dict[Tuple[str, Optional[Path]], Optional[Path]]): Results of
+                                             _find_file_path() during the current split().
+        _name_index (Optional[Dict[str, List[Path]]]): Everything under base_path by
+                                             name, in rglob() order; built on the first
+                                             recursive search of the current split().
+        INPUT_RE: Compiled regex pattern for matching \\input{...} commands.
     
     Examples:
         Basic usage:
@@ -35,6 +55,8 @@ class LatexProjectSplitter:
             30
     """
     
+    INPUT_RE = re.compile(r"""\\input\{([^}]+)\}""")
+    
     def __init__(self, base_path: Path | str):
         """
         Initialize the splitter with a base path.
@@ -45,6 +67,9 @@ class LatexProjectSplitter:
                       relative to this path.
         """
         self.base_path = Path(base_path)
+        self._file_cache: Dict[Path, List[str]] = {}
+        self._path_cache: Dict[Tuple[str, Optional[Path]], Optional[Path]] = {}
+        self._name_index: Optional[Dict[str, List[Path]]] = None
     
     @staticmethod
     def _sanitize_filename(title: str) -> str:
@@ -61,17 +86,69 @@ class LatexProjectSplitter:
         """
         # Replace spaces with underscores
         filename = title.replace(' ', '_')
-        # Remove or replace invalid filename characters
+        # Remove or replace invalid filename characters. On short titles these
+        # replace calls (no-ops when the character is absent) beat both
+        # str.translate and a regex substitution.
         invalid_chars = '<>:"/\\|?*'
         for char in invalid_chars:
             filename = filename.replace(char, '_')
-        # Remove multiple consecutive underscores
+        # Remove multiple consecutive underscores; each pass halves every run
         while '__' in filename:
             filename = filename.replace('__', '_')
         # Remove leading/trailing underscores
         filename = filename.strip('_')
         return filename
     
+    def _read_lines(self, path: Path) -> List[str]:
+        """
+        Return the lines of a source file, reading it only once per split().
+        
+        Sections that live in the same file, and files pulled in by several
+        \\input commands, share one read and one splitlines().
+        
+        Args:
+            path: Path to the source file.
+        
+        Returns:
+            The lines of the file, without line endings. The list is shared
+            between callers and must not be modified.
+        
+        Raises:
+            OSError: If the file cannot be read.
+        """
+        lines = self._file_cache.get(path)
+        if lines is None:
+            lines = path.read_text(encoding='utf-8', errors='replace').splitlines()
+            self._file_cache[path] = lines
+        return lines
+    
+    @staticmethod
+    def _write_text(path: Path, content: str) -> None:
+        """
+        Write content to path as UTF-8 with a single os.write where possible.
+        
+        Equivalent to path.write_text(content, encoding='utf-8') (newlines are
+        translated to os.linesep), without setting up a buffered text writer
+        for every output file.
+        
+        Args:
+            path: The file to create or truncate.
+            content: The text to write.
+        
+        Raises:
+            OSError: If the file cannot be opened or written.
+        """
+        if os.linesep != '\n':
+            content = content.replace('\n', os.linesep)
+        data = memoryview(content.encode('utf-8'))
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+        try:
+            # os.write may write less than asked for
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+    
     def _find_file_path(self, file_path: str, relative_to: Optional[Path] = None) -> Optional[Path]:
         """
         Find the full path to a LaTeX source file.
@@ -85,7 +162,19 @@ class LatexProjectSplitter:
                         that might be relative to the current file).
         
         Returns:
-            Path to the file if found, None otherwise.
+            Path to the file if found, None otherwise. Results, including misses,
+            are remembered until the end of the current split().
+        """
+        key = (file_path, relative_to)
+        if key in self._path_cache:
+            return self._path_cache[key]
+        found = self._search_file_path(file_path, relative_to)
+        self._path_cache[key] = found
+        return found
+    
+    def _search_file_path(self, file_path: str, relative_to: Optional[Path] = None) -> Optional[Path]:
+        """
+        Look up a LaTeX source file on disk; the uncached part of _find_file_path().
         """
         # Normalize path separators
         file_path = file_path.replace('\\', '/')
@@ -104,14 +193,109 @@ class LatexProjectSplitter:
         # Fallback: recursive search (for backward compatibility with old secid files)
         # Only search for the filename part if it looks like just a filename
         if '/' not in file_path:
-            for path in self.base_path.rglob(file_path):
+            # Plain names are looked up in an index from a single walk of the
+            # tree instead of walking it again for every name
+            if (not _CASE_SENSITIVE_FS or file_path in ('', '.', '..')
+                    or any(c in file_path for c in '*?[')):
+                candidates = self.base_path.rglob(file_path)
+            else:
+                candidates = self._search_name_index(file_path)
+            for path in candidates:
                 if path.is_file():
                     return path
         
         return None
     
+    def _search_name_index(self, name: str) -> List[Path]:
+        """
+        Return the paths base_path.rglob(name) would yield, for a plain name.
+        
+        Both walk the directories in the same order, so filtering one
+        rglob('*') walk by exact name gives rglob(name)'s result. That only
+        holds on case-sensitive filesystems; see _CASE_SENSITIVE_FS.
+        
+        Args:
+            name: A filename without separators or glob characters.
+        
+        Returns:
+            Paths named name under base_path, in rglob() order.
+        """
+        if self._name_index is None:
+            self._name_index = {}
+            for path in self.base_path.rglob('*'):
+                self._name_index.setdefault(path.name, []).append(path)
+        return self._name_index.get(name, [])
+    
+    @staticmethod
+    def _level_ranks(entries: List[Dict]) -> List[int]:
+        """
+        Return the hierarchy rank of every entry's level (lower is higher up).
+        
+        Args:
+            entries: List of dictionaries from LatexTocProcessor.process().
+        
+        Returns:
+            One rank per entry: 1 for chapters, 2 for sections, 3 for
+            subsections and 99 for any other level.
+        """
+        rank = _LEVEL_HIERARCHY.get
+        return [rank(e['level'], 99) for e in entries]
+    
+    @staticmethod
+    def _next_boundaries(levels: List[int]) -> List[int]:
+        """
+        For each entry, find the index of the next entry of same or higher level.
+        
+        A single backward pass keeps a stack of candidate indices whose ranks
+        increase towards the top, so the whole table takes O(N) instead of a
+        forward scan per entry.
+        
+        Args:
+            levels: Level ranks as returned by _level_ranks().
+        
+        Returns:
+            A list where item i is the smallest j > i with levels[j] <= levels[i],
+            or len(levels) if there is none.
+        """
+        n = len(levels)
+        boundaries = [n] * n
+        stack: List[int] = []
+        for i in range(n - 1, -1, -1):
+            level = levels[i]
+            while stack and levels[stack[-1]] > level:
+                stack.pop()
+            if stack:
+                boundaries[i] = stack[-1]
+            stack.append(i)
+        return boundaries
+    
+    @staticmethod
+    def _next_other_files(files: List[Optional[str]]) -> List[int]:
+        """
+        Find, for every entry, the next entry in a different source file.
+        
+        Args:
+            files: Source file of each entry (None or '' when unknown).
+        
+        Returns:
+            For each index i, the smallest k > i with files[k] set and
+            different from files[i], or len(files) if there is none.
+        """
+        n = len(files)
+        next_other = [n] * n
+        next_known = n  # Next index after i whose file is set
+        for i in range(n - 1, -1, -1):
+            if next_known < n:
+                if files[next_known] != files[i]:
+                    next_other[i] = next_known
+                else:
+                    next_other[i] = next_other[next_known]
+            if files[i]:
+                next_known = i
+        return next_other
+    
     def _extract_section_content(self, entry: Dict, all_entries: List[Dict], 
-                                 current_index: int) -> str:
+                                 current_index: int, next_index: Optional[int] = None) -> str:
         """
         Extract LaTeX content for a given section/chapter entry.
         
@@ -135,6 +319,10 @@ class LatexProjectSplitter:
             entry: Dictionary with section information (from process()).
             all_entries: List of all entries (filtered, chapters and sections only).
             current_index: Index of current entry in all_entries.
+            next_index: Index of the next entry of same or higher level in
+                       all_entries (len(all_entries) if there is none), as
+                       computed by _next_boundaries(). Looked up by scanning
+                       forward from current_index when omitted.
         
         Returns:
             String containing the LaTeX content for this section.
@@ -144,7 +332,8 @@ class LatexProjectSplitter:
         
         # Use the relative path directly from the entry
         file_path = self.base_path / entry['file']
-        if not file_path.exists():
+        # A file already read during this split() is known to exist
+        if file_path not in self._file_cache and not file_path.exists():
             # Fallback: try searching if direct path doesn't work (for backward compatibility)
             file_path = self._find_file_path(entry['file'])
             if not file_path or not file_path.exists():
@@ -152,7 +341,7 @@ class LatexProjectSplitter:
         
         # Read the source file
         try:
-            lines = file_path.read_text(encoding='utf-8', errors='replace').splitlines()
+            lines = self._read_lines(file_path)
         except Exception as e:
             return f"% {entry['level']}: {entry['title']}\n% Error reading file: {e}\n"
         
@@ -160,40 +349,78 @@ class LatexProjectSplitter:
         if start_line < 0 or start_line >= len(lines):
             return f"% {entry['level']}: {entry['title']}\n% Invalid line number: {entry['line']}\n"
         
-        # Determine the level hierarchy
-        level_hierarchy = {'chapter': 1, 'section': 2, 'subsection': 3}
-        current_level = level_hierarchy.get(entry['level'], 99)
+        if next_index is None:
+            # Determine the level hierarchy
+            current_level = _LEVEL_HIERARCHY.get(entry['level'], 99)
+            next_index = len(all_entries)
+            for i in range(current_index + 1, len(all_entries)):
+                if _LEVEL_HIERARCHY.get(all_entries[i]['level'], 99) <= current_level:
+                    next_index = i
+                    break
         
         # Find the end of this section (next section of same or higher level in same file)
         # Note: This algorithm assumes each section/chapter is contained in one file.
         # For sections that span multiple files, only content in the file where the
         # section command is located will be extracted. \input commands are expanded.
         end_line = len(lines)
-        for i in range(current_index + 1, len(all_entries)):
-            next_entry = all_entries[i]
-            next_level = level_hierarchy.get(next_entry['level'], 99)
-            if next_level <= current_level:
-                # Found next section of same or higher level
-                # Check if it's in the same file
-                if next_entry.get('file') == entry['file'] and next_entry.get('line'):
-                    end_line = next_entry['line'] - 1
-                break
+        if next_index < len(all_entries):
+            # Found next section of same or higher level
+            # Check if it's in the same file
+            next_entry = all_entries[next_index]
+            if next_entry.get('file') == entry['file'] and next_entry.get('line'):
+                end_line = next_entry['line'] - 1
         
         # Extract content from start_line to end_line
         content_lines = lines[start_line:end_line]
         
-        # Process \input commands - expand them recursively
-        result_lines = []
-        processed_inputs = set()  # Track processed inputs to avoid infinite recursion
-        
-        def expand_inputs(line: str, current_file: Optional[Path] = None, depth: int = 0) -> List[str]:
-            """Recursively expand \input commands, preserving relative paths."""
+        # Without any \input in the section there is nothing to expand, so
+        # the joined slice is the result and no line is looked at in Python
+        chunk = '\n'.join(content_lines)
+        if '\\input' not in chunk:
+            return chunk + '\n'
+        
+        # Process \input commands - expand them recursively. Lines are
+        # written straight into one buffer instead of being collected in
+        # per-line lists.
+        out = io.StringIO()
+        write = out.write
+        input_search = self.INPUT_RE.search
+        
+        def expand_text(text: str, current_file: Optional[Path], depth: int, visited: Tuple[str, ...]) -> None:
+            """Write newline-joined lines into out, expanding the ones with \input."""
             if depth > 10:  # Prevent infinite recursion
-                return [line]
-            
-            input_match = re.search(r'\\input\{([^}]+)\}', line)
+                write(text)
+                write('\n')
+                return
+            # Find each line containing \input with str.find over the whole
+            # text; the runs of lines in between are copied in one write
+            find = text.find
+            pos = 0
+            while True:
+                i = find('\\input', pos)
+                if i < 0:
+                    break
+                newline = text.rfind('\n', pos, i)
+                line_start = newline + 1 if newline >= 0 else pos
+                line_end = find('\n', i)
+                if line_end < 0:
+                    line_end = len(text)
+                write(text[pos:line_start])
+                expand_inputs(text[line_start:line_end], current_file, depth, visited)
+                pos = line_end + 1
+                if pos > len(text):
+                    return
+            write(text[pos:])
+            write('\n')
+        
+        def expand_inputs(line: str, current_file: Optional[Path] = None, depth: int = 0,
+                          visited: Tuple[str, ...] = ()) -> None:
+            """Recursively expand \input commands into out, preserving relative paths."""
+            input_match = input_search(line)
             if not input_match:
-                return [line]
+                write(line)
+                write('\n')
+                return
             
             # Get the original input path from the command (may or may not have .tex extension)
             original_input_path = input_match.group(1)
@@ -203,17 +430,21 @@ class LatexProjectSplitter:
             if not input_file.endswith('.tex'):
                 input_file += '.tex'
             
-            # Check if we've already processed this input (using the path with .tex)
-            if input_file in processed_inputs:
-                return [line]  # Keep original to avoid recursion
+            # Check if this input is already being expanded further up (using the
+            # path with .tex); visited is short, as the depth limit bounds it
+            if input_file in visited:
+                # Keep original to avoid recursion
+                write(line)
+                write('\n')
+                return
             
             # Try to find the input file (may be relative to current file or base_path)
             input_path = self._find_file_path(input_file, relative_to=current_file)
-            if input_path and input_path.exists():
+            if input_path and (input_path in self._file_cache or input_path.exists()):
+                # Where this expansion starts, so a failure can take it back
+                start = out.tell()
                 try:
-                    processed_inputs.add(input_file)
-                    input_content = input_path.read_text(encoding='utf-8', errors='replace')
-                    input_lines = input_content.splitlines()
+                    input_lines = self._read_lines(input_path)
                     
                     # Compute relative path from base_path for the comment
                     try:
@@ -228,22 +459,24 @@ class LatexProjectSplitter:
                         relative_path_str = original_input_path
                     
                     # Recursively expand inputs in the included file
-                    expanded_lines = []
-                    for input_line in input_lines:
-                        expanded_lines.extend(expand_inputs(input_line, current_file=input_path, depth=depth + 1))
-                    
-                    processed_inputs.remove(input_file)  # Allow re-inclusion in different contexts
-                    return [f"% Expanded from: \\input{{{relative_path_str}}}"] + expanded_lines
+                    write(f"% Expanded from: \\input{{{relative_path_str}}}\n")
+                    if input_lines:
+                        expand_text('\n'.join(input_lines), input_path, depth + 1, visited + (input_file,))
                 except Exception:
-                    return [line]  # Keep original line if expansion fails
+                    # Keep original line if expansion fails
+                    out.seek(start)
+                    out.truncate()
+                    write(line)
+                    write('\n')
             else:
-                return [line]  # Keep original line if file not found
+                # Keep original line if file not found
+                write(line)
+                write('\n')
         
-        # Process each line, expanding inputs
-        for line in content_lines:
-            result_lines.extend(expand_inputs(line, current_file=file_path))
+        # Process the section, expanding inputs
+        expand_text(chunk, file_path, 0, ())
         
-        return '\n'.join(result_lines) + '\n'
+        return out.getvalue()
     
     def validate_structure(self, data: List[Dict], include_subsections: bool = False) -> List[Dict]:
         """
@@ -289,35 +522,46 @@ class LatexProjectSplitter:
             List of dictionaries with 'entry', 'level', 'title', 'issue', and 'severity' keys
             describing validation issues found.
         """
-        level_hierarchy = {'chapter': 1, 'section': 2, 'subsection': 3}
         issues = []
         
+        # Resolve every entry's level rank and file once; the loops below
+        # revisit the same entries many times
+        files = [e.get('file') for e in data]
+        
+        # Issues need two different source files, so single-file projects
+        # have none
+        if len({f for f in files if f}) <= 1:
+            return issues
+        
+        levels = self._level_ranks(data)
+        next_boundaries = self._next_boundaries(levels)
+        next_other_files = self._next_other_files(files)
+        
         for i, entry in enumerate(data):
-            current_level = level_hierarchy.get(entry['level'], 99)
-            entry_file = entry.get('file')
+            current_level = levels[i]
+            entry_file = files[i]
             
             if not entry_file:
                 continue
             
             # Find the next entry of same or higher level
-            next_same_level_index = None
-            for j in range(i + 1, len(data)):
-                next_entry = data[j]
-                next_level = level_hierarchy.get(next_entry['level'], 99)
-                if next_level <= current_level:
-                    next_same_level_index = j
-                    break
+            next_same_level_index = next_boundaries[i]
+            
+            # Entries before the next one in another file cannot be reported,
+            # so scanning starts there; none before the boundary means no issue
+            first_other = next_other_files[i]
+            if first_other >= next_same_level_index:
+                continue
+            if next_same_level_index == len(data):
+                next_same_level_index = None
             
             # Check entries between current and next same-level entry
             if next_same_level_index is not None:
-                next_entry = data[next_same_level_index]
-                next_entry_file = next_entry.get('file')
-                
                 # Check all entries between current and next same-level entry
-                for k in range(i + 1, next_same_level_index):
+                for k in range(first_other, next_same_level_index):
                     intermediate_entry = data[k]
-                    intermediate_level = level_hierarchy.get(intermediate_entry['level'], 99)
-                    intermediate_file = intermediate_entry.get('file')
+                    intermediate_level = levels[k]
+                    intermediate_file = files[k]
                     
                     # If there's a deeper-level entry (belongs to current section) in a different file
                     # This indicates the section spans multiple files
@@ -342,10 +586,10 @@ class LatexProjectSplitter:
             else:
                 # No next same-level entry found - check if there are any deeper entries in different files
                 # that come after this entry (they would belong to this section)
-                for k in range(i + 1, len(data)):
+                for k in range(first_other, len(data)):
                     intermediate_entry = data[k]
-                    intermediate_level = level_hierarchy.get(intermediate_entry['level'], 99)
-                    intermediate_file = intermediate_entry.get('file')
+                    intermediate_level = levels[k]
+                    intermediate_file = files[k]
                     
                     # If there's a deeper-level entry in a different file after this entry
                     if (intermediate_level > current_level and 
@@ -428,35 +672,50 @@ class LatexProjectSplitter:
         
         # Dictionary to store output file paths
         output_files = {}
-        filename_counts = {}  # Track filename usage to handle duplicates
-        
-        # Process each entry
-        for i, entry in enumerate(filtered_data):
-            # Generate filename from title
-            filename = self._sanitize_filename(entry['title'])
-            if not filename:
-                filename = f"{entry['level']}_{entry['number']}"
-            
-            # Handle duplicate filenames by adding a number suffix
-            base_filename = filename
-            counter = 1
-            while filename in filename_counts:
-                filename = f"{base_filename}_{counter}"
-                counter += 1
-            filename_counts[filename] = True
-            
-            # Add .tex extension
-            filename += '.tex'
-            
-            # Extract content for this section
-            content = self._extract_section_content(entry, filtered_data, i)
-            
-            # Write to output file
-            output_file = output_path / filename
-            output_file.write_text(content, encoding='utf-8')
-            
-            # Store mapping
-            output_files[entry['title']] = output_file
+        used_filenames = set()  # Track filename usage to handle duplicates
+        next_suffix = {}  # First suffix worth trying for each base filename
+        
+        # Where each entry's content ends, for all entries at once
+        next_boundaries = self._next_boundaries(self._level_ranks(filtered_data))
+        
+        # Process each entry. Source files are read and looked up once and
+        # shared between the entries through the caches, dropped afterwards.
+        try:
+            for i, entry in enumerate(filtered_data):
+                # Generate filename from title
+                filename = self._sanitize_filename(entry['title'])
+                if not filename:
+                    filename = f"{entry['level']}_{entry['number']}"
+                
+                # Handle duplicate filenames by adding a number suffix. Suffixes
+                # below next_suffix are known to be taken, so many sections
+                # sharing a title do not re-probe all the earlier ones.
+                if filename in used_filenames:
+                    base_filename = filename
+                    counter = next_suffix.get(base_filename, 1)
+                    filename = f"{base_filename}_{counter}"
+                    while filename in used_filenames:
+                        counter += 1
+                        filename = f"{base_filename}_{counter}"
+                    next_suffix[base_filename] = counter + 1
+                used_filenames.add(filename)
+                
+                # Add .tex extension
+                filename += '.tex'
+                
+                # Extract content for this section
+                content = self._extract_section_content(entry, filtered_data, i, next_boundaries[i])
+                
+                # Write to output file
+                output_file = output_path / filename
+                self._write_text(output_file, content)
+                
+                # Store mapping
+                output_files[entry['title']] = output_file
+        finally:
+            self._file_cache.clear()
+            self._path_cache.clear()
+            self._name_index = None
         
         return output_files
 
@@ -1,105 +1,112 @@
+import dataclasses
+import re
 import pytest
-import tempfile
 import shutil
+import sys
+import threading
 from pathlib import Path
-from typing import List
+from types import SimpleNamespace
+from typing import Dict, List
 
-from dependency_collector import LatexDependencyCollector, DependencyEntry
+from dependency_collector import (
+    LatexDependencyCollector, DependencyEntry, HAS_NUMPY, HAS_PANDAS, HAS_NETWORKX, HAS_PLOTLY,
+)
 
 
-class TestLatexDependencyCollector:
-    """Test suite for LatexDependencyCollector class."""
-
-    @pytest.fixture
-    def temp_dir(self):
-        """Create a temporary directory for test files."""
-        temp_dir = Path(tempfile.mkdtemp())
-        yield temp_dir
-        shutil.rmtree(temp_dir)
-
-    @pytest.fixture
-    def sample_latex_files(self, temp_dir):
-        """Create sample LaTeX files with various dependencies."""
-        # Create main.tex
-        main_tex = temp_dir / "main.tex"
-        main_tex.write_text(r"""\documentclass{book}
+# Sample LaTeX project with various dependencies, by path relative to its root.
+# missing.tex is referenced but deliberately not created.
+_CORPUS: Dict[str, bytes] = {
+    "main.tex": rb"""\documentclass{book}
 \usepackage{amsmath}
 \usepackage{hyperref}
 \input{preamble}
 \include{chapters/ch01}
 \include{chapters/ch02}
 \bibliography{references}
-""")
-
-        # Create preamble.tex
-        preamble_tex = temp_dir / "preamble.tex"
-        preamble_tex.write_text(r"""\usepackage{graphicx}
+""",
+    "preamble.tex": rb"""\usepackage{graphicx}
 \usepackage{enumitem}
 \usepackage{../snippets/secid}
-""")
-
-        # Create chapters directory and files
-        chapters_dir = temp_dir / "chapters"
-        chapters_dir.mkdir()
-
-        ch01_tex = chapters_dir / "ch01.tex"
-        ch01_tex.write_text(r"""\chapter{Introduction}
+""",
+    "chapters/ch01.tex": rb"""\chapter{Introduction}
 \input{sections/sec01}
 \input{sections/sec02}
-""")
-
-        ch02_tex = chapters_dir / "ch02.tex"
-        ch02_tex.write_text(r"""\chapter{Methods}
+""",
+    "chapters/ch02.tex": rb"""\chapter{Methods}
 Some content here.
-""")
-
-        # Create sections directory
-        sections_dir = chapters_dir / "sections"
-        sections_dir.mkdir()
-
-        sec01_tex = sections_dir / "sec01.tex"
-        sec01_tex.write_text(r"""\section{Motivation}
+""",
+    "chapters/sections/sec01.tex": rb"""\section{Motivation}
 \input{sub01}
 \input{sub02}
-""")
-
-        sec02_tex = sections_dir / "sec02.tex"
-        sec02_tex.write_text(r"""\section{Background}
+""",
+    "chapters/sections/sec02.tex": rb"""\section{Background}
 Content here.
-""")
-
-        # Create subsections
-        sub01_tex = sections_dir / "sub01.tex"
-        sub01_tex.write_text(r"""\subsection{Problem}
+""",
+    "chapters/sections/sub01.tex": rb"""\subsection{Problem}
 Some text.
-""")
-
-        sub02_tex = sections_dir / "sub02.tex"
-        sub02_tex.write_text(r"""\subsection{Solution}
+""",
+    "chapters/sections/sub02.tex": rb"""\subsection{Solution}
 More text.
-""")
+""",
+    "with_missing.tex": rb"""\input{missing}
+\input{preamble}
+""",
+}
 
-        # Create a missing file reference
-        missing_tex = temp_dir / "missing.tex"
-        # Don't create the file - it should be marked as not existing
 
-        # Create a file with missing dependency
-        with_missing_tex = temp_dir / "with_missing.tex"
-        with_missing_tex.write_text(r"""\input{missing}
-\input{preamble}
-""")
+def _build_corpus(root: Path) -> None:
+    """Write the sample LaTeX project under root."""
+    for rel, data in _CORPUS.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
 
-        return temp_dir
+def _assert_stdout_contains(capsys, *needles: str) -> None:
+    """Assert that captured stdout contains every needle, reporting all missing ones."""
+    out = capsys.readouterr().out
+    missing = [needle for needle in needles if needle not in out]
+    assert not missing, f"missing from output: {missing}"
+
+
+class TestLatexDependencyCollector:
+    """Test suite for LatexDependencyCollector class."""
+
+    @pytest.fixture(scope="session")
+    def latex_corpus(self, tmp_path_factory):
+        """Create the sample LaTeX project once per test session."""
+        root = tmp_path_factory.mktemp("latex_corpus")
+        _build_corpus(root)
+        return root
+
+    @pytest.fixture
+    def sample_latex_files(self, request, tmp_path, latex_corpus):
+        """Sample LaTeX project; a private copy for tests marked mutates_corpus."""
+        if request.node.get_closest_marker("mutates_corpus") is None:
+            return latex_corpus
+        shutil.copytree(latex_corpus, tmp_path, dirs_exist_ok=True)
+        return tmp_path
+
+    @pytest.fixture(scope="session")
+    def collected_main(self, latex_corpus):
+        """Collect main.tex of the shared corpus once, for tests that only read the results."""
+        collector = LatexDependencyCollector(latex_corpus)
+        return SimpleNamespace(
+            collector=collector,
+            deps=collector.collect_dependencies("main.tex"),
+            tree=collector.get_dependency_tree("main.tex"),
+            files=collector.get_all_files("main.tex"),
+        )
 
     @pytest.fixture
     def collector(self, sample_latex_files):
         """Create a LatexDependencyCollector instance."""
         return LatexDependencyCollector(sample_latex_files)
 
-    def test_init(self, temp_dir):
+    def test_init(self, tmp_path):
         """Test initialization of LatexDependencyCollector."""
-        collector = LatexDependencyCollector(temp_dir)
-        assert collector.base_path == Path(temp_dir)
+        collector = LatexDependencyCollector(tmp_path)
+        assert collector.base_path == Path(tmp_path)
         assert collector.dependencies == []
         assert collector.processed_files == set()
 
@@ -133,9 +140,7 @@ More text.
             ("bibliography", "references", 7),
         ]
 
-        assert len(deps) == len(expected_deps)
-        for expected in expected_deps:
-            assert expected in deps
+        assert sorted(deps) == sorted(expected_deps)
 
     def test_parse_file_dependencies_preamble(self, collector, sample_latex_files):
         """Test parsing dependencies from preamble.tex."""
@@ -147,13 +152,11 @@ More text.
             ("usepackage", "../snippets/secid", 3),
         ]
 
-        assert len(deps) == len(expected_deps)
-        for expected in expected_deps:
-            assert expected in deps
+        assert sorted(deps) == sorted(expected_deps)
 
-    def test_collect_dependencies_main(self, collector):
+    def test_collect_dependencies_main(self, collected_main):
         """Test collecting all dependencies from main.tex."""
-        deps = collector.collect_dependencies("main.tex")
+        deps = collected_main.deps
 
         assert len(deps) > 0
 
@@ -166,7 +169,7 @@ More text.
         assert "bibliography" in dep_types
 
         # Check that main.tex is processed
-        assert "main.tex" in collector.processed_files
+        assert "main.tex" in collected_main.collector.processed_files
 
     def test_collect_dependencies_with_missing_file(self, collector, sample_latex_files):
         """Test collecting dependencies when a file references missing files."""
@@ -183,9 +186,9 @@ More text.
         assert preamble_deps[0].exists
         assert preamble_deps[0].is_tex_file
 
-    def test_get_dependency_tree(self, collector):
+    def test_get_dependency_tree(self, collected_main):
         """Test getting dependencies as a tree structure."""
-        tree = collector.get_dependency_tree("main.tex")
+        tree = collected_main.tree
 
         assert isinstance(tree, dict)
         assert "main.tex" in tree
@@ -199,9 +202,9 @@ More text.
             assert isinstance(dep, DependencyEntry)
             assert dep.included_from == "main.tex"
 
-    def test_get_all_files(self, collector):
+    def test_get_all_files(self, collected_main):
         """Test getting all files involved in the build."""
-        files = collector.get_all_files("main.tex")
+        files = collected_main.files
 
         assert isinstance(files, set)
         assert "main.tex" in files
@@ -209,11 +212,10 @@ More text.
         assert "chapters/ch01.tex" in files
 
         # Should include files that exist
-        existing_files = [f for f in files if (collector.base_path / f).exists]
+        existing_files = [f for f in files if (collected_main.collector.base_path / f).exists()]
         assert len(existing_files) > 0
 
-    @pytest.mark.skipif(not hasattr(LatexDependencyCollector, 'HAS_PANDAS') or not LatexDependencyCollector.HAS_PANDAS,
-                       reason="pandas not available")
+    @pytest.mark.skipif(not HAS_PANDAS, reason="pandas not available")
     def test_to_dataframe(self, collector):
         """Test converting dependencies to pandas DataFrame."""
         df = collector.to_dataframe("main.tex")
@@ -227,13 +229,9 @@ More text.
         """Test printing dependencies as a table."""
         collector.print_table("main.tex")
 
-        captured = capsys.readouterr()
-        assert "file_path" in captured.out
-        assert "include_type" in captured.out
-        assert len(captured.out.strip()) > 0
+        _assert_stdout_contains(capsys, "file_path", "include_type")
 
-    @pytest.mark.skipif(not hasattr(LatexDependencyCollector, 'HAS_NETWORKX') or not LatexDependencyCollector.HAS_NETWORKX,
-                       reason="networkx not available")
+    @pytest.mark.skipif(not HAS_NETWORKX, reason="networkx not available")
     def test_to_networkx_graph(self, collector):
         """Test creating NetworkX graph representation."""
         G = collector.to_networkx_graph("main.tex")
@@ -248,10 +246,8 @@ More text.
         assert root_attrs["exists"] is True
         assert root_attrs["is_tex_file"] is True
 
-    @pytest.mark.skipif(not hasattr(LatexDependencyCollector, 'HAS_NETWORKX') or not LatexDependencyCollector.HAS_NETWORKX,
-                       reason="networkx not available")
-    @pytest.mark.skipif(not hasattr(LatexDependencyCollector, 'HAS_PLOTLY') or not LatexDependencyCollector.HAS_PLOTLY,
-                       reason="plotly not available")
+    @pytest.mark.skipif(not HAS_NETWORKX, reason="networkx not available")
+    @pytest.mark.skipif(not HAS_PLOTLY, reason="plotly not available")
     def test_visualize_dependency_graph(self, collector):
         """Test creating plotly visualization."""
         fig = collector.visualize_dependency_graph("main.tex")
@@ -261,25 +257,30 @@ More text.
         assert hasattr(fig, 'layout')
         assert len(fig.data) > 0
 
-    @pytest.mark.skipif(not hasattr(LatexDependencyCollector, 'HAS_NETWORKX') or not LatexDependencyCollector.HAS_NETWORKX,
-                       reason="networkx not available")
+    @pytest.mark.skipif(not HAS_NETWORKX, reason="networkx not available")
+    @pytest.mark.skipif(not HAS_PLOTLY, reason="plotly not available")
+    def test_layout_cache_keeps_latest_only(self, collector):
+        """Test that only the most recent graph layout is cached."""
+        collector.visualize_dependency_graph("main.tex", layout="circular")
+        collector.visualize_dependency_graph("main.tex", layout="shell")
+
+        assert collector._layout_cache[0][0] == "shell"
+        collector.clear_cache()
+        assert collector._layout_cache is None
+
+    @pytest.mark.skipif(not HAS_NETWORKX, reason="networkx not available")
     def test_print_graph_info(self, collector, capsys):
         """Test printing graph information."""
         collector.print_graph_info("main.tex")
 
-        captured = capsys.readouterr()
-        assert "LaTeX Dependency Graph Information" in captured.out
-        assert "Total nodes" in captured.out
-        assert "Total edges" in captured.out
+        _assert_stdout_contains(capsys, "LaTeX Dependency Graph Information", "Total nodes", "Total edges")
 
-    @pytest.mark.skipif(not hasattr(LatexDependencyCollector, 'HAS_NETWORKX') or not LatexDependencyCollector.HAS_NETWORKX,
-                       reason="networkx not available")
-    @pytest.mark.skipif(not hasattr(LatexDependencyCollector, 'HAS_PLOTLY') or not LatexDependencyCollector.HAS_PLOTLY,
-                       reason="plotly not available")
-    def test_save_dependency_graph_clean(self, collector, temp_dir):
+    @pytest.mark.skipif(not HAS_NETWORKX, reason="networkx not available")
+    @pytest.mark.skipif(not HAS_PLOTLY, reason="plotly not available")
+    def test_save_dependency_graph_clean(self, collector, tmp_path):
         """Test saving clean HTML graph."""
-        output_file = temp_dir / "test_graph.html"
-        result = collector.save_dependency_graph_clean("main.tex", str(output_file))
+        output_file = tmp_path / "test_graph.html"
+        result = collector.save_dependency_graph_clean("main.tex", output_file)
 
         assert result is True
         assert output_file.exists()
@@ -287,19 +288,17 @@ More text.
         assert "LaTeX Dependency Graph" in content
         assert "Plotly" in content
 
-    @pytest.mark.skipif(not hasattr(LatexDependencyCollector, 'HAS_NETWORKX') or not LatexDependencyCollector.HAS_NETWORKX,
-                       reason="networkx not available")
-    @pytest.mark.skipif(not hasattr(LatexDependencyCollector, 'HAS_PLOTLY') or not LatexDependencyCollector.HAS_PLOTLY,
-                       reason="plotly not available")
-    def test_save_dependency_graph_separate(self, collector, temp_dir):
+    @pytest.mark.skipif(not HAS_NETWORKX, reason="networkx not available")
+    @pytest.mark.skipif(not HAS_PLOTLY, reason="plotly not available")
+    def test_save_dependency_graph_separate(self, collector, tmp_path):
         """Test saving separate HTML and JSON files."""
-        html_file = temp_dir / "test_graph.html"
-        json_file = temp_dir / "test_graph.json"
+        html_file = tmp_path / "test_graph.html"
+        json_file = tmp_path / "test_graph.json"
 
         result = collector.save_dependency_graph_separate(
             "main.tex",
-            str(html_file),
-            str(json_file)
+            html_file,
+            json_file
         )
 
         assert result is True
@@ -316,9 +315,9 @@ More text.
         assert '"data"' in json_content
         assert '"layout"' in json_content
 
-    def test_dependency_entry_creation(self, collector):
+    def test_dependency_entry_creation(self, collected_main):
         """Test DependencyEntry creation and attributes."""
-        deps = collector.collect_dependencies("main.tex")
+        deps = collected_main.deps
 
         for dep in deps:
             assert isinstance(dep, DependencyEntry)
@@ -329,20 +328,25 @@ More text.
             assert isinstance(dep.exists, bool)
             assert isinstance(dep.is_tex_file, bool)
 
+    @pytest.mark.mutates_corpus
     def test_circular_dependency_prevention(self, collector, sample_latex_files):
         """Test that circular dependencies are prevented."""
-        # Create a circular dependency
+        # Create a circular dependency; inputs resolve against base_path, so
+        # the chapter refers back to main.tex as plain "main"
         ch01_tex = sample_latex_files / "chapters" / "ch01.tex"
         original_content = ch01_tex.read_text()
-        ch01_tex.write_text(original_content + "\n\\input{../main}\n")
+        ch01_tex.write_text(original_content + "\\input{main}\n")
 
         # Should not cause infinite recursion
         deps = collector.collect_dependencies("main.tex")
 
-        # Should still complete and have finite dependencies
-        assert isinstance(deps, list)
-        assert len(deps) < 100  # Reasonable upper bound
+        # main.tex is parsed once: its seven dependencies appear exactly once,
+        # and the back edge is recorded as a cycle instead of being followed
+        assert sum(d.included_from == "main.tex" for d in deps) == 7
+        assert ("main.tex", "chapters/ch01.tex") in {(d.file_path, d.included_from) for d in deps}
+        assert collector.cycles == [["main.tex", "chapters/ch01.tex", "main.tex"]]
 
+    @pytest.mark.mutates_corpus
     def test_empty_file(self, collector, sample_latex_files):
         """Test handling of empty LaTeX files."""
         empty_tex = sample_latex_files / "empty.tex"
@@ -356,61 +360,256 @@ More text.
         deps = collector._parse_file_dependencies("nonexistent.tex")
         assert deps == []
 
-    def test_regex_patterns(self, collector):
-        """Test that regex patterns work correctly."""
-        # Test input pattern
-        test_content = r"\input{file1} \input file2"
-        temp_file = collector.base_path / "test_regex.tex"
-        temp_file.write_text(test_content)
+    @pytest.mark.parametrize("content, expected", [
+        (r"\input{file1} \input file2",
+         [("input", "file1", 1), ("input", "file2", 1)]),
+        (r"\include{chapters/ch01}",
+         [("include", "chapters/ch01", 1)]),
+        (r"\usepackage{amsmath} \usepackage[options]{hyperref}",
+         [("usepackage", "amsmath", 1), ("usepackage", "hyperref", 1)]),
+        (r"\documentclass{book} \documentclass[options]{article}",
+         [("documentclass", "book", 1), ("documentclass", "article", 1)]),
+        # addbibresource matches the bibliography pattern
+        (r"\bibliography{refs} \addbibresource{main.bib}",
+         [("bibliography", "refs", 1), ("bibliography", "main.bib", 1)]),
+    ], ids=["input", "include", "usepackage", "documentclass", "bibliography"])
+    def test_dependency_patterns(self, tmp_path, content, expected):
+        """Test that each dependency command is matched by its regex pattern."""
+        (tmp_path / "test_pattern.tex").write_text(content)
+
+        collector = LatexDependencyCollector(tmp_path)
+        deps = collector._parse_file_dependencies("test_pattern.tex")
+        assert deps == expected
+
+    def test_patterns_compiled_once(self, collector, sample_latex_files):
+        """Test that the patterns are compiled once on the class and shared by every instance."""
+        names = ("DEPENDENCY_RE", "COMMENT_RE", "NEWLINE_RE")
+        patterns = [getattr(LatexDependencyCollector, name) for name in names]
+        for pattern in patterns:
+            assert isinstance(pattern, re.Pattern)
+
+        deps = collector._parse_file_dependencies("main.tex")
+        assert ("input", "preamble", 4) in deps
+        other = LatexDependencyCollector(sample_latex_files)
+        for name, pattern in zip(names, patterns):
+            assert getattr(collector, name) is pattern
+            assert getattr(other, name) is pattern
+
+    def test_parse_cache_reused(self, collector):
+        """Test that unchanged files are served from the parse cache."""
+        first = collector._parse_file_dependencies("main.tex")
+        second = collector._parse_file_dependencies("main.tex")
+        assert second is first
+        assert "main.tex" in collector._parse_cache
+
+    @pytest.mark.mutates_corpus
+    def test_parse_cache_invalidated_on_change(self, collector, sample_latex_files):
+        """Test that modifying a file invalidates its cached parse result."""
+        first = collector._parse_file_dependencies("chapters/ch02.tex")
+        assert first == []
+
+        ch02_tex = sample_latex_files / "chapters" / "ch02.tex"
+        ch02_tex.write_text(ch02_tex.read_text() + "\\input{extra}\n")
+
+        second = collector._parse_file_dependencies("chapters/ch02.tex")
+        assert ("input", "extra", 3) in second
+
+    def test_clear_cache(self, collector):
+        """Test that clear_cache drops all cached parse results."""
+        collector._parse_file_dependencies("main.tex")
+        collector.clear_cache()
+        assert collector._parse_cache == {}
+
+    def test_deep_inclusion_chain(self, tmp_path):
+        """Test that inclusion chains deeper than the old recursion cap are followed."""
+        depth = 60
+        for i in range(depth):
+            (tmp_path / f"f{i}.tex").write_text(f"\\input{{f{i + 1}}}\n")
+        (tmp_path / f"f{depth}.tex").write_text("")
+
+        collector = LatexDependencyCollector(tmp_path)
+        deps = collector.collect_dependencies("f0.tex")
+
+        assert len(deps) == depth
+        assert f"f{depth}.tex" in collector.processed_files
+
+    def test_collect_dependencies_document_order(self, tmp_path):
+        """Test that entries are emitted in depth-first (document) order."""
+        (tmp_path / "main.tex").write_text("\\input{a}\n\\input{b}\n\\usepackage{amsmath}\n")
+        (tmp_path / "a.tex").write_text("\\input{a1}\n\\input{b}\n")
+        (tmp_path / "a1.tex").write_text("")
+        (tmp_path / "b.tex").write_text("\\input{c}\n")
+        (tmp_path / "c.tex").write_text("")
+
+        collector = LatexDependencyCollector(tmp_path)
+        deps = collector.collect_dependencies("main.tex")
 
-        deps = collector._parse_file_dependencies("test_regex.tex")
-        input_deps = [d for d in deps if d[0] == "input"]
-        assert len(input_deps) == 2
-        assert ("input", "file1", 1) in deps
-        assert ("input", "file2", 1) in deps
+        assert [(d.included_from, d.file_path, d.line_number) for d in deps] == [
+            ("main.tex", "a.tex", 1),
+            ("a.tex", "a1.tex", 1),
+            ("a.tex", "b.tex", 2),
+            ("b.tex", "c.tex", 1),
+            ("main.tex", "b.tex", 2),
+            ("main.tex", "amsmath.tex", 3),
+        ]
 
-    def test_include_pattern(self, collector):
-        """Test include pattern matching."""
-        test_content = r"\include{chapters/ch01}"
-        temp_file = collector.base_path / "test_include.tex"
+    def test_collect_dependencies_leaves_no_threads(self, tmp_path):
+        """Test that the parse thread pool is shut down when collection finishes."""
+        (tmp_path / "main.tex").write_text("".join(f"\\input{{f{i}}}\n" for i in range(8)))
+        for i in range(8):
+            (tmp_path / f"f{i}.tex").write_text("")
+        before = set(threading.enumerate())
+
+        collector = LatexDependencyCollector(tmp_path)
+        collector.collect_dependencies("main.tex")
+
+        assert set(threading.enumerate()) == before
+
+    @pytest.mark.mutates_corpus
+    def test_commented_dependencies_ignored(self, collector):
+        """Test that inclusions inside TeX comments are not reported."""
+        test_content = (
+            "% \\include{commented}\n"
+            "\\input{real} % \\input{trailing}\n"
+            "50\\% \\input{escaped}\n"
+            "\\\\% \\input{after_linebreak}\n"
+        )
+        temp_file = collector.base_path / "test_comments.tex"
         temp_file.write_text(test_content)
 
-        deps = collector._parse_file_dependencies("test_include.tex")
-        assert len(deps) == 1
-        assert deps[0] == ("include", "chapters/ch01", 1)
+        deps = collector._parse_file_dependencies("test_comments.tex")
+        assert deps == [("input", "real", 2), ("input", "escaped", 3)]
+
+    def test_dependency_entry_uses_slots(self):
+        """Test that DependencyEntry instances carry no per-instance __dict__."""
+        entry = DependencyEntry("a.tex", "input", "main.tex", 1, True, True)
+        assert not hasattr(entry, "__dict__")
+        # Some Python versions (e.g. 3.11) raise TypeError here for frozen slotted dataclasses
+        with pytest.raises((AttributeError, TypeError)):
+            entry.unknown_field = 1
+
+    def test_normalize_file_path_memoized(self, collector):
+        """Test that normalized paths are memoized per raw path."""
+        first = collector._normalize_file_path("chapters/ch01", "main.tex")
+        second = collector._normalize_file_path("chapters/ch01", "preamble.tex")
+        assert first == second == "chapters/ch01.tex"
+        assert collector._norm_cache == {"chapters/ch01": "chapters/ch01.tex"}
+
+    @pytest.mark.mutates_corpus
+    def test_non_tex_files_not_parsed(self, collector):
+        """Test that files without a TeX suffix are skipped before reading."""
+        (collector.base_path / "figure.png").write_bytes(b"\\input{fake}\x00\xff")
+        assert collector._parse_file_dependencies("figure.png") == []
+
+    def test_oversized_files_not_parsed(self, collector, monkeypatch):
+        """Test that files above MAX_PARSE_BYTES are skipped."""
+        monkeypatch.setattr(LatexDependencyCollector, "MAX_PARSE_BYTES", 4)
+        assert collector._parse_file_dependencies("main.tex") == []
+
+    @pytest.mark.skipif(not HAS_NUMPY, reason="numpy not available")
+    def test_line_numbers_numpy_matches_bisect(self, monkeypatch):
+        """Test that the numpy line lookup agrees with the bisect fallback."""
+        text = "a\né€\n\nbc\n\U0001d11e\nd"
+        offsets = list(range(len(text)))
+
+        monkeypatch.setattr(LatexDependencyCollector, "NUMPY_MIN_MATCHES", 1)
+        vectorized = LatexDependencyCollector._line_numbers(text, offsets)
+        monkeypatch.setattr(LatexDependencyCollector, "NUMPY_MIN_MATCHES", len(offsets) + 1)
+        bisected = LatexDependencyCollector._line_numbers(text, offsets)
+
+        assert vectorized == bisected
+        assert bisected[-1] == 6
+
+    def test_collect_dependencies_memoized(self, collector):
+        """Test that repeated collection of unchanged files reuses the result."""
+        first = collector.collect_dependencies("main.tex")
+        second = collector.collect_dependencies("main.tex")
+        assert isinstance(first, tuple)
+        assert second is first
+        assert "chapters/ch01.tex" in collector.processed_files
+
+    def test_collect_dependencies_entries_immutable(self, collector):
+        """Test that a caller cannot alter the memoized result through a returned entry."""
+        deps = collector.collect_dependencies("main.tex")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            deps[0].file_path = "changed.tex"
 
-    def test_usepackage_pattern(self, collector):
-        """Test usepackage pattern matching."""
-        test_content = r"\usepackage{amsmath} \usepackage[options]{hyperref}"
-        temp_file = collector.base_path / "test_pkg.tex"
-        temp_file.write_text(test_content)
+        again = collector.collect_dependencies("main.tex")
+        assert again[0].file_path == deps[0].file_path != "changed.tex"
+        assert collector.get_dependency_tree("main.tex")["main.tex"][0].file_path != "changed.tex"
 
-        deps = collector._parse_file_dependencies("test_pkg.tex")
-        usepackage_deps = [d for d in deps if d[0] == "usepackage"]
-        assert len(usepackage_deps) == 2
-        assert ("usepackage", "amsmath", 1) in deps
-        assert ("usepackage", "hyperref", 1) in deps
+    @pytest.mark.mutates_corpus
+    def test_collect_dependencies_invalidated_by_new_file(self, collector, sample_latex_files):
+        """Test that creating a previously missing dependency refreshes the result."""
+        deps = collector.collect_dependencies("with_missing.tex")
+        assert not [d for d in deps if d.file_path == "missing.tex"][0].exists
 
-    def test_documentclass_pattern(self, collector):
-        """Test documentclass pattern matching."""
-        test_content = r"\documentclass{book} \documentclass[options]{article}"
-        temp_file = collector.base_path / "test_doc.tex"
-        temp_file.write_text(test_content)
+        (sample_latex_files / "missing.tex").write_text("\\input{chapters/ch02}\n")
 
-        deps = collector._parse_file_dependencies("test_doc.tex")
-        doc_deps = [d for d in deps if d[0] == "documentclass"]
-        assert len(doc_deps) == 2
-        assert ("documentclass", "book", 1) in deps
-        assert ("documentclass", "article", 1) in deps
+        deps = collector.collect_dependencies("with_missing.tex")
+        assert [d for d in deps if d.file_path == "missing.tex"][0].exists
+        assert "chapters/ch02.tex" in {d.file_path for d in deps}
 
-    def test_bibliography_pattern(self, collector):
-        """Test bibliography pattern matching."""
-        test_content = r"\bibliography{refs} \addbibresource{main.bib}"
-        temp_file = collector.base_path / "test_bib.tex"
+    def test_print_table_fallback(self, collector, capsys, monkeypatch):
+        """Test the plain-text table used when pandas is not available."""
+        import dependency_collector
+        monkeypatch.setattr(dependency_collector, "get_pandas", lambda: None)
+        collector.print_table("main.tex")
+
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0].split(" | ")[0].strip() == "file_path"
+        assert set(lines[1]) == {"-"}
+        assert len(lines) == 2 + len(collector.dependencies)
+        assert len({len(line) for line in lines[2:]}) == 1
+
+    def test_print_table_broken_pandas(self, collector, capsys, monkeypatch, request):
+        """Test that a pandas install that fails to import falls back to the plain table."""
+        import dependency_collector
+        monkeypatch.setattr(dependency_collector, "HAS_PANDAS", dependency_collector.HAS_PANDAS)
+        # A None entry in sys.modules makes "import pandas" raise ImportError;
+        # the cached result is dropped before and after so the import is retried
+        monkeypatch.setitem(sys.modules, "pandas", None)
+        dependency_collector.get_pandas.cache_clear()
+        request.addfinalizer(dependency_collector.get_pandas.cache_clear)
+        assert dependency_collector.get_pandas() is None
+        assert dependency_collector.HAS_PANDAS is False
+        assert collector.to_dataframe("main.tex") is None
+        collector.print_table("main.tex")
+
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0].split(" | ")[0].strip() == "file_path"
+        assert set(lines[1]) == {"-"}
+
+    def test_no_cycles_in_acyclic_project(self, collector):
+        """Test that an acyclic project reports no inclusion cycles."""
+        collector.collect_dependencies("main.tex")
+        assert collector.cycles == []
+
+    def test_cycles_reported(self, tmp_path):
+        """Test that inclusion cycles are recorded as closed file paths."""
+        (tmp_path / "main.tex").write_text("\\input{a}\n")
+        (tmp_path / "a.tex").write_text("\\input{b}\n")
+        (tmp_path / "b.tex").write_text("\\input{a}\n\\input{b}\n")
+
+        collector = LatexDependencyCollector(tmp_path)
+        collector.collect_dependencies("main.tex")
+
+        assert ["a.tex", "b.tex", "a.tex"] in collector.cycles
+        assert ["b.tex", "b.tex"] in collector.cycles
+        assert len(collector.cycles) == 2
+
+    @pytest.mark.mutates_corpus
+    def test_usepackage_list_split(self, collector):
+        """Test that comma-separated package and bibliography lists yield one entry each."""
+        test_content = "\\usepackage[utf8]{amsmath, amssymb,graphicx}\n\\bibliography{refs,extra}\n"
+        temp_file = collector.base_path / "test_pkg_list.tex"
         temp_file.write_text(test_content)
 
-        deps = collector._parse_file_dependencies("test_bib.tex")
-        bib_deps = [d for d in deps if d[0] in ["bibliography", "addbibresource"]]
-        assert len(bib_deps) == 2
-        assert ("bibliography", "refs", 1) in deps
-        assert ("bibliography", "main.bib", 1) in deps  # addbibresource matches bibliography pattern
\ No newline at end of file
+        deps = collector._parse_file_dependencies("test_pkg_list.tex")
+        assert deps == [
+            ("usepackage", "amsmath", 1),
+            ("usepackage", "amssymb", 1),
+            ("usepackage", "graphicx", 1),
+            ("bibliography", "refs", 2),
+            ("bibliography", "extra", 2),
+        ]
@@ -1,73 +1,126 @@
 """
 Comprehensive pytest tests for LatexTocProcessor class.
 """
+import copy
+import importlib.util
+import re
+import sys
 import pytest
 import tempfile
 from pathlib import Path
 
 try:
-    from process import LatexTocProcessor, TocEntry, HAS_PANDAS
+    from process import LatexTocProcessor, TocEntry, HAS_REGEX
 except ImportError:
-    from snippets.process import LatexTocProcessor, TocEntry, HAS_PANDAS
+    from snippets.process import LatexTocProcessor, TocEntry, HAS_REGEX
 
-
-@pytest.fixture
-def temp_dir():
-    """Create a temporary directory for test files."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        yield Path(tmpdir)
+HAS_BENCHMARK = importlib.util.find_spec("pytest_benchmark") is not None
+HAS_PANDAS = importlib.util.find_spec("pandas") is not None
 
 
-@pytest.fixture
-def sample_toc_content():
-    """Sample TOC file content."""
-    return """\\contentsline {chapter}{[secid=1]\\numberline {1}Introduction}{1}{chapter.1}%
+# Sample TOC file content.
+SAMPLE_TOC_CONTENT = """\\contentsline {chapter}{[secid=1]\\numberline {1}Introduction}{1}{chapter.1}%
 \\contentsline {section}{[secid=2]\\numberline {1.1}Motivation}{1}{section.1.1}%
 \\contentsline {subsection}{[secid=3]\\numberline {1.1.1}Background}{1}{subsection.1.1.1}%
 \\contentsline {chapter}{[secid=4]Appendix}{9}{chapter*.2}%
 """
 
-
-@pytest.fixture
-def sample_aux_content():
-    """Sample aux file content."""
-    return """\\relax 
+# Sample aux file content.
+SAMPLE_AUX_CONTENT = """\\relax 
 \\newlabel{chap:intro}{{1}{1}{Introduction}{chapter.1}{}}
 \\newlabel{sec:motivation}{{1.1}{1}{Motivation}{section.1.1}{}}
 \\newlabel{subsec:background}{{1.1.1}{1}{Background}{subsection.1.1.1}{}}
 \\newlabel{chap:appendix}{{4.1.2}{9}{Appendix}{chapter*.2}{}}
 """
 
-
-@pytest.fixture
-def sample_secid_content():
-    """Sample secid file content."""
-    return """1|document.tex|20
+# Sample secid file content.
+SAMPLE_SECID_CONTENT = """1|document.tex|20
 2|document.tex|22
 3|document.tex|23
 4|document.tex|78
 """
 
+# The sample files are written as bytes, encoded once
+SAMPLE_TOC_BYTES = SAMPLE_TOC_CONTENT.encode("utf-8")
+SAMPLE_AUX_BYTES = SAMPLE_AUX_CONTENT.encode("utf-8")
+SAMPLE_SECID_BYTES = SAMPLE_SECID_CONTENT.encode("utf-8")
 
-@pytest.fixture
-def sample_files(temp_dir, sample_toc_content, sample_aux_content, sample_secid_content):
-    """Create sample test files."""
-    toc_file = temp_dir / "test.toc"
-    aux_file = temp_dir / "test.aux"
-    secid_file = temp_dir / "test.secid"
+# Copies of the sample files in the benchmark inputs (4 TOC entries per copy)
+BENCH_COPIES = 2500
+# Timed rounds per benchmark; each round parses from a cleared cache
+BENCH_ROUNDS = 20
+
+
+@pytest.fixture(scope="module")
+def processor_cwd():
+    """One processor on "." shared by tests of methods that keep no state."""
+    return LatexTocProcessor(".")
+
+
+def _write_sample_files(base):
+    """Write the sample TOC, aux and secid files to base and return their paths."""
+    toc_file = base / "test.toc"
+    aux_file = base / "test.aux"
+    secid_file = base / "test.secid"
     
-    toc_file.write_text(sample_toc_content, encoding="utf-8")
-    aux_file.write_text(sample_aux_content, encoding="utf-8")
-    secid_file.write_text(sample_secid_content, encoding="utf-8")
+    toc_file.write_bytes(SAMPLE_TOC_BYTES)
+    aux_file.write_bytes(SAMPLE_AUX_BYTES)
+    secid_file.write_bytes(SAMPLE_SECID_BYTES)
     
     return {
         "toc": toc_file,
         "aux": aux_file,
         "secid": secid_file,
-        "base": temp_dir
+        "base": base
     }
 
 
+@pytest.fixture(scope="module")
+def sample_files(tmp_path_factory):
+    """Create sample test files once per module; tests must not modify them."""
+    return _write_sample_files(tmp_path_factory.mktemp("sample_files"))
+
+
+@pytest.fixture(scope="module")
+def parsed_entries_template(sample_files):
+    """The sample TOC parsed once per module; tests use copies via parsed_entries."""
+    return LatexTocProcessor(sample_files["base"]).parse_toc(sample_files["toc"])
+
+
+@pytest.fixture
+def parsed_entries(parsed_entries_template):
+    """Fresh copies of the parsed sample TOC entries, safe to modify."""
+    return [copy.copy(entry) for entry in parsed_entries_template]
+
+
+@pytest.fixture
+def sample_files_mutable(tmp_path):
+    """Create sample test files in a private directory, for tests that change them."""
+    return _write_sample_files(tmp_path)
+
+
+@pytest.fixture(scope="module")
+def large_sample_files(tmp_path_factory):
+    """The sample files repeated BENCH_COPIES times, written once per module."""
+    base = tmp_path_factory.mktemp("large_sample_files")
+    files = {"base": base}
+    for kind, content in (("toc", SAMPLE_TOC_BYTES), ("aux", SAMPLE_AUX_BYTES),
+                          ("secid", SAMPLE_SECID_BYTES)):
+        files[kind] = base / f"test.{kind}"
+        files[kind].write_bytes(content * BENCH_COPIES)
+    return files
+
+
+@pytest.fixture
+def make_case(tmp_path):
+    """Factory that writes one small input file and returns (processor, path)."""
+    def _make(name, content):
+        path = tmp_path / name
+        path.write_bytes(content.encode("utf-8"))
+        return LatexTocProcessor(tmp_path), path
+    return _make
+
+
 class TestTocEntry:
     """Tests for TocEntry dataclass."""
     
@@ -111,103 +164,132 @@ class TestTocEntry:
         assert entry.secid is None
         assert entry.file is None
         assert entry.line is None
+    
+    def test_toc_entry_uses_slots(self):
+        """Test that TocEntry instances carry no per-instance __dict__."""
+        entry = TocEntry(level="section", number="1", title="Intro", page="1")
+        assert not hasattr(entry, "__dict__")
+        with pytest.raises(AttributeError):
+            entry.unknown_field = 1
 
 
 class TestLatexTocProcessor:
     """Tests for LatexTocProcessor class."""
     
-    def test_init_with_string_path(self):
-        """Test initialization with string path."""
-        processor = LatexTocProcessor("snippets")
+    @pytest.mark.parametrize("base_path", ["snippets", Path("snippets")], ids=["str", "path"])
+    def test_init(self, base_path):
+        """Test initialization with a string or Path base path."""
+        processor = LatexTocProcessor(base_path)
         assert processor.base_path == Path("snippets")
         assert processor.entries == []
     
-    def test_init_with_path_object(self):
-        """Test initialization with Path object."""
-        path = Path("snippets")
-        processor = LatexTocProcessor(path)
-        assert processor.base_path == path
-        assert processor.entries == []
-    
     def test_tex_unbrace(self):
         """Test _tex_unbrace static method."""
         assert LatexTocProcessor._tex_unbrace("  Hello World  ") == "Hello World"
         assert LatexTocProcessor._tex_unbrace("Text") == "Text"
         assert LatexTocProcessor._tex_unbrace("") == ""
     
-    def test_find_brace_end_simple(self):
-        """Test _find_brace_end with simple braces."""
-        text = "{hello}"
-        result = LatexTocProcessor._find_brace_end(text, 1)  # Start after '{'
-        assert result == 6  # Index of closing '}'
-    
-    def test_find_brace_end_nested(self):
-        """Test _find_brace_end with nested braces."""
-        text = "{\\numberline{1}Title}"
-        result = LatexTocProcessor._find_brace_end(text, 1)  # Start after opening '{'
-        assert result == len(text) - 1  # Should find the closing '}'
-    
-    def test_find_brace_end_unbalanced(self):
-        """Test _find_brace_end with unbalanced braces."""
-        text = "{hello"
-        result = LatexTocProcessor._find_brace_end(text, 1)
-        assert result == -1
-    
-    def test_parse_toc_line_valid(self):
-        """Test _parse_toc_line with valid input."""
-        processor = LatexTocProcessor(".")
-        line = "\\contentsline{chapter}{\\numberline{1}Introduction}{1}{chapter.1}"
-        result = processor._parse_toc_line(line)
-        assert result is not None
-        level, body, page, label_ref = result
-        assert level == "chapter"
-        assert "\\numberline{1}Introduction" in body
-        assert page == "1"
-        assert label_ref == "chapter.1"
-    
-    def test_parse_toc_line_without_label(self):
-        """Test _parse_toc_line without label argument."""
-        processor = LatexTocProcessor(".")
-        line = "\\contentsline{section}{Title}{5}"
-        result = processor._parse_toc_line(line)
-        assert result is not None
-        level, body, page, label_ref = result
-        assert level == "section"
-        assert body == "Title"
-        assert page == "5"
-        assert label_ref is None
-    
-    def test_parse_toc_line_invalid(self):
+    @pytest.mark.parametrize("text, start, expected", [
+        ("{hello}", 1, 6),  # Index of closing '}'
+        ("{\\numberline{1}Title}", 1, 20),
+        ("{hello", 1, -1),
+    ], ids=["simple", "nested", "unbalanced"])
+    def test_find_brace_end(self, text, start, expected):
+        """Test _find_brace_end, starting just after an opening brace."""
+        assert LatexTocProcessor._find_brace_end(text, start) == expected
+    
+    @pytest.mark.parametrize("line, expected", [
+        ("\\contentsline{chapter}{\\numberline{1}Introduction}{1}{chapter.1}",
+         ("chapter", "\\numberline{1}Introduction", "1", "chapter.1")),
+        # Without the label argument
+        ("\\contentsline{section}{Title}{5}",
+         ("section", "Title", "5", None)),
+        # Leading whitespace before the command
+        ("  \\contentsline {section}{Title}{5}{section.1}",
+         ("section", "Title", "5", "section.1")),
+        # Deep nesting falls back to brace matching
+        ("\\contentsline{section}{\\numberline{2}\\emph{A {B} C}}{7}{section.2}",
+         ("section", "\\numberline{2}\\emph{A {B} C}", "7", "section.2")),
+    ], ids=["valid", "without_label", "leading_whitespace", "deeply_nested"])
+    def test_parse_toc_line(self, processor_cwd, line, expected):
+        """Test _parse_toc_line on well-formed contentsline entries."""
+        assert processor_cwd._parse_toc_line(line) == expected
+    
+    @pytest.mark.parametrize("use_regex", [False, True])
+    def test_find_brace_end_nested(self, use_regex, monkeypatch):
+        """Test brace matching with and without the regex module."""
+        if use_regex and not HAS_REGEX:
+            pytest.skip("regex not available")
+        monkeypatch.setattr(sys.modules[LatexTocProcessor.__module__], "HAS_REGEX", use_regex)
+        text = "{a {b {c}} d} tail}"
+        assert LatexTocProcessor._find_brace_end(text, 1) == 12
+        assert LatexTocProcessor._find_brace_end(text, 13) == 18
+        assert LatexTocProcessor._find_brace_end("{a {b}", 1) == -1
+    
+    def test_parse_toc_line_invalid(self, processor_cwd):
         """Test _parse_toc_line with invalid input."""
-        processor = LatexTocProcessor(".")
-        assert processor._parse_toc_line("not a contentsline") is None
-        assert processor._parse_toc_line("") is None
+        assert processor_cwd._parse_toc_line("not a contentsline") is None
+        assert processor_cwd._parse_toc_line("") is None
     
     def test_parse_toc(self, sample_files):
         """Test parse_toc method."""
         processor = LatexTocProcessor(sample_files["base"])
         entries = processor.parse_toc(sample_files["toc"])
         
-        assert len(entries) == 4
-        assert entries[0].level == "chapter"
-        assert entries[0].number == "1"
-        assert entries[0].title == "Introduction"
-        assert entries[0].page == "1"
-        assert entries[0].secid == 1
-        assert entries[0].label_ref == "chapter.1"
+        assert entries == [
+            TocEntry(level="chapter", number="1", title="Introduction", page="1",
+                     label_ref="chapter.1", secid=1),
+            TocEntry(level="section", number="1.1", title="Motivation", page="1",
+                     label_ref="section.1.1", secid=2),
+            TocEntry(level="subsection", number="1.1.1", title="Background", page="1",
+                     label_ref="subsection.1.1.1", secid=3),
+            # Unnumbered appendix
+            TocEntry(level="chapter", number=None, title="Appendix", page="9",
+                     label_ref="chapter*.2", secid=4),
+        ]
+    
+    def test_parse_toc_trims_fields(self, make_case):
+        """Test that padded fields are trimmed and an empty label becomes None."""
+        processor, toc_file = make_case(
+            "padded.toc",
+            "\\contentsline { section }{ [secid=7] \\numberline { 2.1 } Results }{ 5 }{}\n",
+        )
+        entries = processor.parse_toc(toc_file)
         
-        assert entries[1].level == "section"
-        assert entries[1].number == "1.1"
-        assert entries[1].title == "Motivation"
-        assert entries[1].secid == 2
+        assert entries == [
+            TocEntry(level="section", number="2.1", title="Results", page="5",
+                     label_ref=None, secid=7),
+        ]
+    
+    def test_parse_toc_interns_level_and_page(self, sample_files):
+        """Test that repeated level and page values share one string object."""
+        processor = LatexTocProcessor(sample_files["base"])
+        entries = processor.parse_toc(sample_files["toc"])
         
-        assert entries[3].level == "chapter"
-        assert entries[3].number is None  # Unnumbered appendix
-        assert entries[3].title == "Appendix"
+        assert entries[0].level is entries[3].level
+        assert entries[0].page is entries[1].page
     
-    def test_parse_toc_nonexistent_file(self, temp_dir):
+    def test_parse_files_invalid_utf8(self, tmp_path):
+        """Test that bytes which are not valid UTF-8 are replaced rather than rejected."""
+        toc_file = tmp_path / "bad.toc"
+        toc_file.write_bytes(b"\\contentsline {chapter}{[secid=1]\\numberline {1}Caf\xe9}{1}{chapter.1}%\n")
+        aux_file = tmp_path / "bad.aux"
+        aux_file.write_bytes(b"\\newlabel{chap:caf\xe9}{{1}{1}{Caf\xe9}{chapter.1}{}}\n")
+        secid_file = tmp_path / "bad.secid"
+        secid_file.write_bytes(b"1|caf\xe9.tex|20\n")
+        
+        processor = LatexTocProcessor(tmp_path)
+        entries = processor.parse_toc(toc_file)
+        assert len(entries) == 1
+        assert entries[0].title == "Caf\ufffd"
+        assert entries[0].number == "1"
+        assert entries[0].secid == 1
+        assert processor.parse_aux_labels(aux_file) == {"chapter.1": "chap:caf\ufffd"}
+        assert processor.parse_sectpos(secid_file) == {1: ("caf\ufffd.tex", 20)}
+    
+    def test_parse_toc_nonexistent_file(self, tmp_path):
         """Test parse_toc with nonexistent file."""
-        processor = LatexTocProcessor(temp_dir)
+        processor = LatexTocProcessor(tmp_path)
         with pytest.raises(FileNotFoundError):
             processor.parse_toc("nonexistent.toc")
     
@@ -216,15 +298,16 @@ class TestLatexTocProcessor:
         processor = LatexTocProcessor(sample_files["base"])
         labels = processor.parse_aux_labels(sample_files["aux"])
         
-        assert len(labels) == 4
-        assert labels["chapter.1"] == "chap:intro"
-        assert labels["section.1.1"] == "sec:motivation"
-        assert labels["subsection.1.1.1"] == "subsec:background"
-        assert labels["chapter*.2"] == "chap:appendix"
+        assert labels == {
+            "chapter.1": "chap:intro",
+            "section.1.1": "sec:motivation",
+            "subsection.1.1.1": "subsec:background",
+            "chapter*.2": "chap:appendix",
+        }
     
-    def test_parse_aux_labels_nonexistent_file(self, temp_dir):
+    def test_parse_aux_labels_nonexistent_file(self, tmp_path):
         """Test parse_aux_labels with nonexistent file."""
-        processor = LatexTocProcessor(temp_dir)
+        processor = LatexTocProcessor(tmp_path)
         with pytest.raises(FileNotFoundError):
             processor.parse_aux_labels("nonexistent.aux")
     
@@ -233,30 +316,117 @@ class TestLatexTocProcessor:
         processor = LatexTocProcessor(sample_files["base"])
         positions = processor.parse_sectpos(sample_files["secid"])
         
-        assert len(positions) == 4
-        assert positions[1] == ("document.tex", 20)
-        assert positions[2] == ("document.tex", 22)
-        assert positions[3] == ("document.tex", 23)
-        assert positions[4] == ("document.tex", 78)
+        assert positions == {
+            1: ("document.tex", 20),
+            2: ("document.tex", 22),
+            3: ("document.tex", 23),
+            4: ("document.tex", 78),
+        }
     
-    def test_parse_sectpos_nonexistent_file(self, temp_dir):
+    def test_parse_sectpos_nonexistent_file(self, tmp_path):
         """Test parse_sectpos with nonexistent file (should return empty dict)."""
-        processor = LatexTocProcessor(temp_dir)
+        processor = LatexTocProcessor(tmp_path)
         positions = processor.parse_sectpos("nonexistent.secid")
         assert positions == {}
     
-    def test_parse_sectpos_invalid_lines(self, temp_dir):
+    def test_parse_sectpos_invalid_lines(self, make_case):
         """Test parse_sectpos with invalid lines."""
-        secid_file = temp_dir / "invalid.secid"
-        secid_file.write_text("invalid line\nanother invalid\n", encoding="utf-8")
-        
-        processor = LatexTocProcessor(temp_dir)
+        processor, secid_file = make_case("invalid.secid", "invalid line\nanother invalid\n")
         positions = processor.parse_sectpos(secid_file)
         assert positions == {}
     
-    def test_attach_positions(self):
+    def test_patterns_compiled_once(self, sample_files):
+        """Test that the patterns are compiled once on the class and shared by every instance."""
+        names = ("NUMBERLINE_RE", "SECID_RE", "AUX_NEWLABEL_RE", "TOC_ENTRY_RE",
+                 "CONTENTSLINE_PREFIX_RE", "CONTENTSLINE_RE")
+        patterns = [getattr(LatexTocProcessor, name) for name in names]
+        for pattern in patterns:
+            assert isinstance(pattern, re.Pattern)
+        
+        processor = LatexTocProcessor(sample_files["base"])
+        assert len(processor.parse_toc(sample_files["toc"])) == 4
+        assert len(processor.parse_aux_labels(sample_files["aux"])) == 4
+        assert len(processor.parse_sectpos(sample_files["secid"])) == 4
+        other = LatexTocProcessor(sample_files["base"])
+        for name, pattern in zip(names, patterns):
+            assert getattr(processor, name) is pattern
+            assert getattr(other, name) is pattern
+    
+    def test_parse_files_memory_mapped(self, sample_files_mutable, monkeypatch):
+        """Test that parsing through mmap gives the same results as reading."""
+        processor = LatexTocProcessor(sample_files_mutable["base"])
+        expected = (
+            processor.parse_toc(sample_files_mutable["toc"]),
+            processor.parse_aux_labels(sample_files_mutable["aux"]),
+            processor.parse_sectpos(sample_files_mutable["secid"]),
+        )
+        empty_file = sample_files_mutable["base"] / "empty.aux"
+        empty_file.write_bytes(b"")
+        
+        monkeypatch.setattr(LatexTocProcessor, "MMAP_MIN_BYTES", 1)
+        assert processor.parse_toc(sample_files_mutable["toc"]) == expected[0]
+        assert processor.parse_aux_labels(sample_files_mutable["aux"]) == expected[1]
+        assert processor.parse_sectpos(sample_files_mutable["secid"]) == expected[2]
+        assert processor.parse_aux_labels(empty_file) == {}
+    
+    def test_parse_cache_reused(self, sample_files):
+        """Test that unchanged files are served from the parse cache."""
+        processor = LatexTocProcessor(sample_files["base"])
+        first = processor.parse_toc(sample_files["toc"])
+        first[0].file = "mutated.tex"
+        second = processor.parse_toc(sample_files["toc"])
+        
+        assert ("toc", str(sample_files["toc"])) in processor._parse_cache
+        assert second is not first
+        assert second[0].file is None
+        assert [e.title for e in second] == [e.title for e in first]
+    
+    def test_parse_cache_invalidated_on_change(self, sample_files_mutable):
+        """Test that modifying a file invalidates its cached parse result."""
+        processor = LatexTocProcessor(sample_files_mutable["base"])
+        assert len(processor.parse_sectpos(sample_files_mutable["secid"])) == 4
+        
+        with open(sample_files_mutable["secid"], "a", encoding="utf-8") as f:
+            f.write("5|document.tex|90\n")
+        
+        positions = processor.parse_sectpos(sample_files_mutable["secid"])
+        assert positions[5] == ("document.tex", 90)
+    
+    def test_clear_cache(self, sample_files):
+        """Test that clear_cache drops all cached parse results."""
+        processor = LatexTocProcessor(sample_files["base"])
+        processor.process()
+        assert processor._parse_cache
+        processor.clear_cache()
+        assert processor._parse_cache == {}
+    
+    def test_process_disk_cache(self, sample_files_mutable, monkeypatch):
+        """Test that process() results are reused from cache_dir across instances."""
+        cache_dir = sample_files_mutable["base"] / ".cache"
+        data = LatexTocProcessor(sample_files_mutable["base"], cache_dir=cache_dir).process()
+        assert (cache_dir / "test.tocparsed.pkl").exists()
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("parsed despite an up-to-date cache")
+        
+        processor = LatexTocProcessor(sample_files_mutable["base"], cache_dir=cache_dir)
+        monkeypatch.setattr(processor, "parse_toc", fail)
+        assert processor.process() == data
+        assert len(processor.entries) == 4
+    
+    def test_process_disk_cache_invalidated_on_change(self, sample_files_mutable):
+        """Test that changing an input file bypasses the on-disk cache."""
+        cache_dir = sample_files_mutable["base"] / ".cache"
+        LatexTocProcessor(sample_files_mutable["base"], cache_dir=cache_dir).process()
+        
+        with open(sample_files_mutable["aux"], "a", encoding="utf-8") as f:
+            f.write("\\newlabel{sec:new}{{1.1}{1}{Motivation}{section.1.1}{}}\n")
+        
+        data = LatexTocProcessor(sample_files_mutable["base"], cache_dir=cache_dir).process()
+        assert data[1]["label"] == "sec:new"
+    
+    def test_attach_positions(self, processor_cwd):
         """Test _attach_positions method."""
-        processor = LatexTocProcessor(".")
         entries = [
             TocEntry(level="chapter", number="1", title="Intro", page="1", secid=1),
             TocEntry(level="section", number="1.1", title="Section", page="1", secid=2),
@@ -267,18 +437,19 @@ class TestLatexTocProcessor:
             2: ("document.tex", 22),
         }
         
-        processor._attach_positions(entries, posmap)
+        processor_cwd._attach_positions(entries, posmap)
         
-        assert entries[0].file == "document.tex"
-        assert entries[0].line == 20
-        assert entries[1].file == "document.tex"
-        assert entries[1].line == 22
-        assert entries[2].file is None  # No secid, so no position attached
-        assert entries[2].line is None
+        assert entries == [
+            TocEntry(level="chapter", number="1", title="Intro", page="1", secid=1,
+                     file="document.tex", line=20),
+            TocEntry(level="section", number="1.1", title="Section", page="1", secid=2,
+                     file="document.tex", line=22),
+            # No secid, so no position attached
+            TocEntry(level="subsection", number="1.1.1", title="Subsection", page="1", secid=None),
+        ]
     
-    def test_attach_labels(self):
+    def test_attach_labels(self, processor_cwd):
         """Test _attach_labels method."""
-        processor = LatexTocProcessor(".")
         entries = [
             TocEntry(level="chapter", number="1", title="Intro", page="1", label_ref="chapter.1"),
             TocEntry(level="section", number="1.1", title="Section", page="1", label_ref="section.1.1"),
@@ -289,44 +460,65 @@ class TestLatexTocProcessor:
             "section.1.1": "sec:motivation",
         }
         
-        processor._attach_labels(entries, labelmap)
+        processor_cwd._attach_labels(entries, labelmap)
         
-        assert entries[0].label_name == "chap:intro"
-        assert entries[1].label_name == "sec:motivation"
-        assert entries[2].label_name is None  # No label_ref, so no label attached
+        assert entries == [
+            TocEntry(level="chapter", number="1", title="Intro", page="1", label_ref="chapter.1",
+                     label_name="chap:intro"),
+            TocEntry(level="section", number="1.1", title="Section", page="1", label_ref="section.1.1",
+                     label_name="sec:motivation"),
+            # No label_ref, so no label attached
+            TocEntry(level="subsection", number="1.1.1", title="Subsection", page="1", label_ref=None),
+        ]
+    
+    def test_attach_positions_and_labels(self, processor_cwd):
+        """Test that the fused pass matches the two separate attach passes."""
+        def make_entries():
+            return [
+                TocEntry(level="chapter", number="1", title="Intro", page="1", label_ref="chapter.1", secid=1),
+                TocEntry(level="section", number="1.1", title="Section", page="1", label_ref="section.9", secid=2),
+                TocEntry(level="section", number="1.2", title="Other", page="2", label_ref=None, secid=None),
+            ]
+        posmap = {1: ("document.tex", 20)}
+        labelmap = {"chapter.1": "chap:intro"}
+        
+        # Also with either map empty, e.g. when there is no secid file
+        for pos, labels in ((posmap, labelmap), ({}, labelmap), (posmap, {}), ({}, {})):
+            separate = make_entries()
+            processor_cwd._attach_positions(separate, pos)
+            processor_cwd._attach_labels(separate, labels)
+            fused = make_entries()
+            processor_cwd._attach_positions_and_labels(fused, pos, labels)
+            
+            assert fused == separate
+            assert fused[0].file == ("document.tex" if pos else None)
+            assert fused[0].label_name == ("chap:intro" if labels else None)
+            assert fused[1].file is None and fused[1].label_name is None
     
     def test_process(self, sample_files):
         """Test process method."""
         processor = LatexTocProcessor(sample_files["base"])
         data = processor.process()
         
-        assert len(data) == 4
-        assert data[0]["number"] == "1"
-        assert data[0]["level"] == "chapter"
-        assert data[0]["title"] == "Introduction"
-        assert data[0]["page"] == "1"
-        assert data[0]["file"] == "document.tex"
-        assert data[0]["line"] == 20
-        assert data[0]["label"] == "chap:intro"
-        
-        assert data[1]["number"] == "1.1"
-        assert data[1]["level"] == "section"
-        assert data[1]["title"] == "Motivation"
-        assert data[1]["file"] == "document.tex"
-        assert data[1]["line"] == 22
-        assert data[1]["label"] == "sec:motivation"
-        
-        assert data[3]["number"] == "*"  # Unnumbered appendix
-        assert data[3]["level"] == "chapter"
-        assert data[3]["title"] == "Appendix"
+        assert data == [
+            {"number": "1", "level": "chapter", "page": "1", "file": "document.tex",
+             "line": 20, "label": "chap:intro", "title": "Introduction"},
+            {"number": "1.1", "level": "section", "page": "1", "file": "document.tex",
+             "line": 22, "label": "sec:motivation", "title": "Motivation"},
+            {"number": "1.1.1", "level": "subsection", "page": "1", "file": "document.tex",
+             "line": 23, "label": "subsec:background", "title": "Background"},
+            # Unnumbered appendix
+            {"number": "*", "level": "chapter", "page": "9", "file": "document.tex",
+             "line": 78, "label": "chap:appendix", "title": "Appendix"},
+        ]
     
-    def test_process_custom_filenames(self, sample_files):
+    def test_process_custom_filenames(self, sample_files_mutable):
         """Test process with custom filenames."""
-        processor = LatexTocProcessor(sample_files["base"])
+        processor = LatexTocProcessor(sample_files_mutable["base"])
         # Rename files
-        sample_files["toc"].rename(sample_files["base"] / "custom.toc")
-        sample_files["aux"].rename(sample_files["base"] / "custom.aux")
-        sample_files["secid"].rename(sample_files["base"] / "custom.secid")
+        sample_files_mutable["toc"].rename(sample_files_mutable["base"] / "custom.toc")
+        sample_files_mutable["aux"].rename(sample_files_mutable["base"] / "custom.aux")
+        sample_files_mutable["secid"].rename(sample_files_mutable["base"] / "custom.secid")
         
         data = processor.process("custom.toc", "custom.secid", "custom.aux")
         assert len(data) == 4
@@ -340,117 +532,272 @@ class TestLatexTocProcessor:
         assert len(processor.entries) == 4
         assert isinstance(processor.entries[0], TocEntry)
     
+    def test_process_many(self, sample_files, tmp_path):
+        """Test processing several documents in worker processes."""
+        second = tmp_path / "second"
+        second.mkdir()
+        (second / "test.toc").write_bytes(SAMPLE_TOC_BYTES.splitlines(keepends=True)[0])
+        (second / "test.aux").write_bytes(SAMPLE_AUX_BYTES)
+        
+        results = LatexTocProcessor.process_many([sample_files["base"], second], max_workers=2)
+        
+        assert results[0] == LatexTocProcessor(sample_files["base"]).process()
+        assert len(results[1]) == 1
+        assert results[1][0]["title"] == "Introduction"
+        assert results[1][0]["file"] is None
+        assert LatexTocProcessor.process_many([]) == []
+    
+    @pytest.mark.skipif(not HAS_PANDAS, reason="pandas not available")
     def test_to_dataframe(self, sample_files):
         """Test to_dataframe method."""
         processor = LatexTocProcessor(sample_files["base"])
         df = processor.to_dataframe()
         
-        if HAS_PANDAS:
-            assert df is not None
-            assert len(df) == 4
-            assert list(df.columns) == ["number", "level", "page", "file", "line", "label", "title"]
-            assert df.iloc[0]["title"] == "Introduction"
-        else:
-            assert df is None
+        assert len(df) == 4
+        assert list(df.columns) == ["number", "level", "page", "file", "line", "label", "title"]
+        assert df.iloc[0]["title"] == "Introduction"
     
-    def test_print_table(self, sample_files, capsys):
-        """Test print_table method."""
+    def test_to_dataframe_without_pandas(self, sample_files, monkeypatch):
+        """Test that to_dataframe returns None when pandas is not available."""
+        monkeypatch.setattr(sys.modules[LatexTocProcessor.__module__], "get_pandas", lambda: None)
+        assert LatexTocProcessor(sample_files["base"]).to_dataframe() is None
+    
+    def test_process_missing_files(self, sample_files):
+        """Test that process() requires the TOC and aux files but not the secid file."""
         processor = LatexTocProcessor(sample_files["base"])
-        processor.print_table()
+        with pytest.raises(FileNotFoundError, match="missing.toc"):
+            processor.process("missing.toc", "test.secid", "test.aux")
+        with pytest.raises(FileNotFoundError, match="missing.aux"):
+            processor.process("test.toc", "test.secid", "missing.aux")
         
-        captured = capsys.readouterr()
-        assert "Introduction" in captured.out
-        assert "Motivation" in captured.out
-        assert "number" in captured.out or "number" in captured.out.lower()
+        data = processor.process("test.toc", "missing.secid", "test.aux")
+        assert len(data) == 4
+        assert all(row["file"] is None and row["line"] is None for row in data)
+        assert data[0]["label"] == "chap:intro"
+    
+    def test_process_file_paths(self, sample_files_mutable):
+        """Test that absolute paths under base_path become relative and separators are normalized."""
+        base = sample_files_mutable["base"]
+        outside = Path(tempfile.gettempdir()).resolve().parent / "elsewhere" / "x.tex"
+        sample_files_mutable["secid"].write_text(
+            f"1|{(base / 'chapters' / 'ch01.tex').as_posix()}|20\n"
+            + "2|chapters\\ch02.tex|22\n"
+            + f"3|{outside.as_posix()}|23\n",
+            encoding="utf-8",
+        )
+        data = LatexTocProcessor(base).process()
+        
+        assert [row["file"] for row in data] == [
+            "chapters/ch01.tex", "chapters/ch02.tex", outside.as_posix(), None,
+        ]
     
-    def test_print_table_empty_data(self, temp_dir, capsys):
-        """Test print_table with no data."""
-        processor = LatexTocProcessor(temp_dir)
+    def test_process_columns_match_process(self, sample_files):
+        """Test that the columnar result holds the same values as process()."""
+        processor = LatexTocProcessor(sample_files["base"])
+        data = processor.process()
+        columns = processor._process_columns()
+        
+        assert list(columns) == list(LatexTocProcessor.COLUMNS)
+        assert [dict(zip(columns, row)) for row in zip(*columns.values())] == data
+    
+    @pytest.mark.skipif(not HAS_PANDAS, reason="pandas not available")
+    def test_to_dataframe_empty_keeps_columns(self, tmp_path):
+        """Test that an empty TOC still yields a DataFrame with all columns."""
+        for name in ("empty.toc", "empty.secid", "empty.aux"):
+            (tmp_path / name).write_bytes(b"")
+        df = LatexTocProcessor(tmp_path).to_dataframe("empty.toc", "empty.secid", "empty.aux")
+        assert len(df) == 0
+        assert list(df.columns) == list(LatexTocProcessor.COLUMNS)
+    
+    def test_process_filtered(self, sample_files):
+        """Test that process_filtered drops the excluded levels and keeps the rest."""
+        processor = LatexTocProcessor(sample_files["base"])
+        data = processor.process()
+        
+        assert processor.process_filtered() == [e for e in data if e["level"] != "subsection"]
+        chapters = processor.process_filtered(exclude_levels=["section", "subsection"])
+        assert chapters == [e for e in data if e["level"] == "chapter"]
+        assert processor.process_filtered(exclude_levels=[]) == data
+    
+    def test_import_defers_pandas(self):
+        """Test that importing the module does not import pandas."""
+        import subprocess
+        code = "import sys, process; print('pandas' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=Path(__file__).parent)
+        assert result.stdout.strip() == "False"
+    
+    def test_format_table(self, sample_files):
+        """Test format_table method."""
+        table = LatexTocProcessor(sample_files["base"]).format_table()
+        
+        assert "Introduction" in table
+        assert "Motivation" in table
+        assert "number" in table
+    
+    def test_format_table_fallback(self, sample_files, monkeypatch):
+        """Test the plain-text table used when pandas is not available."""
+        monkeypatch.setattr(sys.modules[LatexTocProcessor.__module__], "get_pandas", lambda: None)
+        lines = LatexTocProcessor(sample_files["base"]).format_table().splitlines()
+        
+        assert [h.strip() for h in lines[0].split(" | ")] == list(LatexTocProcessor.COLUMNS)
+        assert set(lines[1]) == {"-"}
+        assert len(lines) == 2 + 4
+        assert len({len(line) for line in lines}) == 1
+        assert "Introduction" in lines[2]
+    
+    def test_broken_pandas_falls_back(self, sample_files, monkeypatch, request):
+        """Test that a pandas install that fails to import gives the plain-text table."""
+        from dependency_collector import get_pandas
+        # A None entry in sys.modules makes "import pandas" raise ImportError;
+        # the cached result is dropped before and after so the import is retried
+        monkeypatch.setitem(sys.modules, "pandas", None)
+        get_pandas.cache_clear()
+        request.addfinalizer(get_pandas.cache_clear)
+        processor = LatexTocProcessor(sample_files["base"])
+        
+        assert processor.to_dataframe() is None
+        lines = processor.format_table().splitlines()
+        assert [h.strip() for h in lines[0].split(" | ")] == list(LatexTocProcessor.COLUMNS)
+        assert set(lines[1]) == {"-"}
+    
+    @pytest.mark.parametrize("pandas", [False, True], ids=["fallback", "pandas"])
+    def test_format_table_empty_data(self, tmp_path, monkeypatch, pandas):
+        """Test format_table with no data."""
+        if pandas and not HAS_PANDAS:
+            pytest.skip("pandas not available")
+        if not pandas:
+            monkeypatch.setattr(sys.modules[LatexTocProcessor.__module__], "get_pandas", lambda: None)
         # Create empty files
-        (temp_dir / "empty.toc").write_text("", encoding="utf-8")
-        (temp_dir / "empty.secid").write_text("", encoding="utf-8")
-        (temp_dir / "empty.aux").write_text("", encoding="utf-8")
+        for name in ("empty.toc", "empty.secid", "empty.aux"):
+            (tmp_path / name).write_bytes(b"")
         
-        processor.print_table("empty.toc", "empty.secid", "empty.aux")
-        captured = capsys.readouterr()
-        assert "No data to display" in captured.out or len(captured.out.strip()) == 0
+        table = LatexTocProcessor(tmp_path).format_table("empty.toc", "empty.secid", "empty.aux")
+        assert table == "No data to display"
+    
+    def test_print_table(self, sample_files, capsys):
+        """Test that print_table prints the formatted table."""
+        processor = LatexTocProcessor(sample_files["base"])
+        processor.print_table()
+        
+        assert capsys.readouterr().out == processor.format_table() + "\n"
 
 
 class TestEdgeCases:
     """Tests for edge cases and error conditions."""
     
-    def test_toc_without_secid(self, temp_dir):
+    def test_toc_without_secid(self, make_case):
         """Test parsing TOC without secid markers."""
-        toc_content = "\\contentsline{chapter}{\\numberline{1}Title}{1}{chapter.1}%"
-        toc_file = temp_dir / "no_secid.toc"
-        toc_file.write_text(toc_content, encoding="utf-8")
-        
-        processor = LatexTocProcessor(temp_dir)
+        processor, toc_file = make_case(
+            "no_secid.toc", "\\contentsline{chapter}{\\numberline{1}Title}{1}{chapter.1}%")
         entries = processor.parse_toc(toc_file)
         
         assert len(entries) == 1
         assert entries[0].secid is None
         assert entries[0].title == "Title"
     
-    def test_toc_without_numberline(self, temp_dir):
+    def test_toc_without_numberline(self, make_case):
         """Test parsing TOC without numberline command."""
-        toc_content = "\\contentsline{chapter}{Title}{1}{chapter.1}%"
-        toc_file = temp_dir / "no_number.toc"
-        toc_file.write_text(toc_content, encoding="utf-8")
-        
-        processor = LatexTocProcessor(temp_dir)
+        processor, toc_file = make_case("no_number.toc", "\\contentsline{chapter}{Title}{1}{chapter.1}%")
         entries = processor.parse_toc(toc_file)
         
         assert len(entries) == 1
         assert entries[0].number is None
         assert entries[0].title == "Title"
     
-    def test_aux_without_label_ref(self, temp_dir):
+    def test_aux_without_label_ref(self, make_case):
         """Test parsing aux file with labels that have no label_ref."""
-        aux_content = "\\newlabel{label1}{{1}{1}{Title}{}{}}\n"
-        aux_file = temp_dir / "no_ref.aux"
-        aux_file.write_text(aux_content, encoding="utf-8")
-        
-        processor = LatexTocProcessor(temp_dir)
+        processor, aux_file = make_case("no_ref.aux", "\\newlabel{label1}{{1}{1}{Title}{}{}}\n")
         labels = processor.parse_aux_labels(aux_file)
         
         assert len(labels) == 0  # Empty label_ref should be skipped
     
-    def test_secid_with_extra_whitespace(self, temp_dir):
+    def test_secid_with_extra_whitespace(self, make_case):
         """Test parsing secid file with extra whitespace."""
-        # The regex uses ^ anchor, so leading whitespace won't match
-        # Test with trailing whitespace only (which should be stripped)
-        secid_content = "1|document.tex|20  \n2|document.tex|22\n"
-        secid_file = temp_dir / "whitespace.secid"
-        secid_file.write_text(secid_content, encoding="utf-8")
-        
-        processor = LatexTocProcessor(temp_dir)
+        # Leading whitespace makes the secid field non-numeric, so the row is
+        # skipped; test with trailing whitespace only (which should be stripped)
+        processor, secid_file = make_case("whitespace.secid", "1|document.tex|20  \n2|document.tex|22\n")
         positions = processor.parse_sectpos(secid_file)
         
         assert positions[1] == ("document.tex", 20)
         assert positions[2] == ("document.tex", 22)
     
-    def test_mismatched_secid(self, sample_files):
+    @pytest.mark.parametrize("newline", ["\r", "\u2028", "\x0c"], ids=["cr", "line_separator", "form_feed"])
+    def test_other_line_breaks(self, make_case, parsed_entries_template, newline):
+        """Test that every line break str.splitlines() knows separates TOC and secid rows."""
+        toc_processor, toc_file = make_case("breaks.toc", SAMPLE_TOC_CONTENT.replace("\n", newline))
+        secid_processor, secid_file = make_case("breaks.secid", SAMPLE_SECID_CONTENT.replace("\n", newline))
+        
+        assert toc_processor.parse_toc(toc_file) == parsed_entries_template
+        assert secid_processor.parse_sectpos(secid_file) == {
+            1: ("document.tex", 20), 2: ("document.tex", 22),
+            3: ("document.tex", 23), 4: ("document.tex", 78),
+        }
+    
+    def test_unicode_blank_padding(self, make_case):
+        """Test that Unicode blanks such as U+00A0 are trimmed like ASCII ones."""
+        nbsp = "\u00a0"
+        processor, toc_file = make_case(
+            "nbsp.toc",
+            f"{nbsp}\\contentsline {{{nbsp}section{nbsp}}}{{[secid=2]\\numberline {{{nbsp}1.1}}"
+            f"Motivation{nbsp}}}{{{nbsp}1}}{{section.1.1{nbsp}}}%\n",
+        )
+        _, aux_file = make_case("nbsp.aux", f"\\newlabel{{{nbsp}sec:motivation}}{{{{1.1}}{{1}}{{M}}{{{nbsp}section.1.1}}{{}}}}\n")
+        _, secid_file = make_case("nbsp.secid", f"2|document.tex|22{nbsp}\n")
+        
+        assert processor.parse_toc(toc_file) == [
+            TocEntry(level="section", number="1.1", title="Motivation", page="1",
+                     label_ref="section.1.1", secid=2),
+        ]
+        assert processor.parse_aux_labels(aux_file) == {"section.1.1": "sec:motivation"}
+        assert processor.parse_sectpos(secid_file) == {2: ("document.tex", 22)}
+    
+    @pytest.mark.parametrize("field", range(4), ids=["level", "body", "page", "label"])
+    def test_long_padded_field(self, make_case, field):
+        """Test that long blank runs in a TOC field are parsed in linear time.
+        
+        There is no timing check; with 5,000 blanks per run a backtracking
+        pattern would not finish within any reasonable test timeout.
+        """
+        blanks = " " * 5000
+        fields = ["chapter", "[secid=1]\\numberline {1}Introduction", "1", "chapter.1"]
+        padded = fields.copy()
+        padded[field] = blanks + fields[field] + blanks
+        # The same field left unclosed, so the fused pattern has to fail
+        unclosed = (
+            "".join(f"{{{f}}}" for f in fields[:field])
+            + "{" + blanks + fields[field] + blanks
+            + "".join(f"{{{f}}}" for f in fields[field + 1:])
+        )
+        processor, toc_file = make_case(
+            "padded.toc",
+            "\\contentsline " + "".join(f"{{{f}}}" for f in padded) + "\n"
+            + "\\contentsline " + unclosed + "\n",
+        )
+        
+        entries = processor.parse_toc(toc_file)
+        assert entries[0] == TocEntry(level="chapter", number="1", title="Introduction",
+                                      page="1", label_ref="chapter.1", secid=1)
+    
+    def test_mismatched_secid(self, processor_cwd, parsed_entries):
         """Test processing when secid doesn't match."""
-        processor = LatexTocProcessor(sample_files["base"])
-        entries = processor.parse_toc(sample_files["toc"])
+        entries = parsed_entries
         
         # Create position map with mismatched secid
         posmap = {999: ("other.tex", 100)}
-        processor._attach_positions(entries, posmap)
+        processor_cwd._attach_positions(entries, posmap)
         
         # Entries should not have file/line set
         assert entries[0].file is None
         assert entries[0].line is None
     
-    def test_mismatched_label_ref(self, sample_files):
+    def test_mismatched_label_ref(self, processor_cwd, parsed_entries):
         """Test processing when label_ref doesn't match."""
-        processor = LatexTocProcessor(sample_files["base"])
-        entries = processor.parse_toc(sample_files["toc"])
+        entries = parsed_entries
         
         # Create label map with mismatched label_ref
         labelmap = {"nonexistent.ref": "some:label"}
-        processor._attach_labels(entries, labelmap)
+        processor_cwd._attach_labels(entries, labelmap)
         
         # Entries should not have label_name set
         assert entries[0].label_name is None
@@ -485,3 +832,29 @@ class TestIntegration:
         assert all("line" in d for d in data)
         assert all("label" in d for d in data)
 
+
+@pytest.mark.slow
+@pytest.mark.skipif(not HAS_BENCHMARK, reason="pytest-benchmark not available")
+class TestBenchmarks:
+    """Timing guards for the parsers on a 10,000-entry document."""
+    
+    def test_bench_parse_toc(self, benchmark, large_sample_files):
+        """Benchmark parse_toc."""
+        processor = LatexTocProcessor(large_sample_files["base"])
+        entries = benchmark.pedantic(processor.parse_toc, args=(large_sample_files["toc"],),
+                                     setup=processor.clear_cache, rounds=BENCH_ROUNDS, warmup_rounds=1)
+        assert len(entries) == 4 * BENCH_COPIES
+    
+    def test_bench_parse_aux_labels(self, benchmark, large_sample_files):
+        """Benchmark parse_aux_labels."""
+        processor = LatexTocProcessor(large_sample_files["base"])
+        labels = benchmark.pedantic(processor.parse_aux_labels, args=(large_sample_files["aux"],),
+                                    setup=processor.clear_cache, rounds=BENCH_ROUNDS, warmup_rounds=1)
+        assert len(labels) == 4
+    
+    def test_bench_parse_sectpos(self, benchmark, large_sample_files):
+        """Benchmark parse_sectpos."""
+        processor = LatexTocProcessor(large_sample_files["base"])
+        positions = benchmark.pedantic(processor.parse_sectpos, args=(large_sample_files["secid"],),
+                                       setup=processor.clear_cache, rounds=BENCH_ROUNDS, warmup_rounds=1)
+        assert len(positions) == 4
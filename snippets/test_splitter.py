@@ -0,0 +1,323 @@
+"""
+Pytest tests for LatexProjectSplitter class.
+"""
+import pytest
+from pathlib import Path
+from typing import Dict, Optional
+
+from splitter import LatexProjectSplitter
+
+
+def _entry(level: str, title: str, file: Optional[str], line: Optional[int], number: str = "1") -> Dict:
+    """Build a TOC entry the way LatexTocProcessor.process() returns it."""
+    return {"level": level, "title": title, "number": number, "file": file, "line": line}
+
+
+def _write(root: Path, files: Dict[str, str]) -> None:
+    """Write source files under root, keyed by relative path."""
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+
+class TestLatexProjectSplitter:
+    """Test suite for LatexProjectSplitter class."""
+
+    @pytest.fixture
+    def extract(self, tmp_path):
+        """Write files under tmp_path and extract the single section starting at doc.tex line 1."""
+        def extract(files: Dict[str, str], line: int = 1) -> str:
+            _write(tmp_path, files)
+            splitter = LatexProjectSplitter(tmp_path)
+            entries = [_entry("section", "Only", "doc.tex", line)]
+            return splitter._extract_section_content(entries[0], entries, 0)
+        return extract
+
+    @pytest.fixture
+    def nested_tree(self, tmp_path):
+        """A project whose file names repeat in several directories."""
+        _write(tmp_path, {
+            "main.tex": "",
+            "a/x.tex": "",
+            "b/c/x.tex": "",
+            "b/y.tex": "",
+            "d/y.tex/z.tex": "",   # y.tex is also a directory name
+            "e/f/g/deep.tex": "",
+            "e/Deep.tex": "",
+        })
+        return tmp_path
+
+    @pytest.mark.parametrize("name", ["x.tex", "y.tex", "z.tex", "deep.tex", "Deep.tex", "nowhere.tex"])
+    def test_find_file_path_matches_rglob(self, nested_tree, name):
+        """Test that a bare name resolves to the first file rglob() yields for it, or None."""
+        expected = next((p for p in nested_tree.rglob(name) if p.is_file()), None)
+        splitter = LatexProjectSplitter(nested_tree)
+        assert splitter._find_file_path(name) == expected
+
+    def test_find_file_path_same_name_first_in_walk_order(self, nested_tree):
+        """Test that of two files with the same name the one rglob() yields first wins."""
+        candidates = [p for p in nested_tree.rglob("x.tex") if p.is_file()]
+        assert len(candidates) == 2
+        splitter = LatexProjectSplitter(nested_tree)
+        assert splitter._find_file_path("x.tex") == candidates[0]
+        assert splitter._search_name_index("x.tex") == list(nested_tree.rglob("x.tex"))
+
+    def test_find_file_path_prefers_direct_path(self, nested_tree):
+        """Test that paths relative to base_path are used before any search."""
+        splitter = LatexProjectSplitter(nested_tree)
+        assert splitter._find_file_path("b/c/x.tex") == nested_tree / "b/c/x.tex"
+        assert splitter._find_file_path("main.tex") == nested_tree / "main.tex"
+        assert splitter._find_file_path("b/missing.tex") is None
+
+    def test_sanitize_filename(self):
+        """Test that titles become filenames without spaces, invalid characters or repeated underscores."""
+        assert LatexProjectSplitter._sanitize_filename(' A  "B"/C:D? ') == "A_B_C_D"
+        assert LatexProjectSplitter._sanitize_filename("***") == ""
+
+    def test_no_input(self, extract):
+        """Test that a section without \\input is copied as is."""
+        assert extract({"doc.tex": "\\section{Only}\ntext\n"}) == "\\section{Only}\ntext\n"
+
+    def test_input_first_and_last_line(self, extract):
+        """Test \\input on the first and the last line of a section without a final newline."""
+        content = extract({
+            "doc.tex": "\\input{a}\nmiddle\n\\input{b}",
+            "a.tex": "A\n",
+            "b.tex": "B1\nB2\n",
+        })
+        assert content == (
+            "% Expanded from: \\input{a}\nA\n"
+            "middle\n"
+            "% Expanded from: \\input{b}\nB1\nB2\n"
+        )
+
+    def test_input_before_trailing_empty_line(self, extract):
+        """Test that an empty last line after an \\input line is kept."""
+        content = extract({"doc.tex": "x\n\\input{a}\n\n", "a.tex": "A"})
+        assert content == "x\n% Expanded from: \\input{a}\nA\n\n"
+
+    def test_input_in_the_middle_of_a_line(self, extract):
+        """Test that a line containing \\input is replaced by the expansion as a whole."""
+        content = extract({"doc.tex": "before \\input{a} after\nend\n", "a.tex": "A\n"})
+        assert content == "% Expanded from: \\input{a}\nA\nend\n"
+
+    def test_empty_input_file(self, extract):
+        """Test that an empty input file leaves only the expansion comment."""
+        content = extract({"doc.tex": "\\input{a}\nend\n", "a.tex": ""})
+        assert content == "% Expanded from: \\input{a}\nend\n"
+
+    def test_nested_inputs(self, extract):
+        """Test that inputs inside input files are expanded recursively."""
+        content = extract({
+            "doc.tex": "\\input{a}\n",
+            "a.tex": "A\n\\input{sub/b}\nA end\n",
+            "sub/b.tex": "B\n",
+        })
+        assert content == (
+            "% Expanded from: \\input{a}\nA\n"
+            "% Expanded from: \\input{sub/b}\nB\n"
+            "A end\n"
+        )
+
+    def test_cyclic_inputs(self, extract):
+        """Test that an input already being expanded is kept as a plain \\input line."""
+        content = extract({
+            "doc.tex": "\\input{a}\n",
+            "a.tex": "A\n\\input{b}\n",
+            "b.tex": "B\n\\input{a}\n",
+        })
+        assert content == (
+            "% Expanded from: \\input{a}\nA\n"
+            "% Expanded from: \\input{b}\nB\n"
+            "\\input{a}\n"
+        )
+
+    def test_repeated_input_expanded_each_time(self, extract):
+        """Test that the same file is expanded again when input twice side by side."""
+        content = extract({"doc.tex": "\\input{a}\n\\input{a}\n", "a.tex": "A\n"})
+        assert content == "% Expanded from: \\input{a}\nA\n" * 2
+
+    def test_input_depth_cap(self, extract):
+        """Test that \\input lines in files nested more than ten levels deep are kept as is."""
+        files = {"doc.tex": "\\input{f1}\n"}
+        for i in range(1, 15):
+            files[f"f{i}.tex"] = f"F{i}\n\\input{{f{i + 1}}}\n"
+        content = extract(files)
+
+        expected = "".join(f"% Expanded from: \\input{{f{i}}}\nF{i}\n" for i in range(1, 12))
+        assert content == expected + "\\input{f12}\n"
+
+    def test_missing_input_kept(self, extract):
+        """Test that an \\input of a file that does not exist is kept as is."""
+        content = extract({"doc.tex": "\\input{missing}\nend\n"})
+        assert content == "\\input{missing}\nend\n"
+
+    def test_unreadable_input_rolled_back(self, extract, tmp_path):
+        """Test that an input that cannot be read leaves no partial expansion behind."""
+        (tmp_path / "broken.tex").mkdir()
+        content = extract({
+            "doc.tex": "\\input{a}\n",
+            "a.tex": "A\n\\input{broken}\nA end\n",
+        })
+        assert content == "% Expanded from: \\input{a}\nA\n\\input{broken}\nA end\n"
+
+    def test_failed_nested_expansion_rolled_back(self, extract, monkeypatch):
+        """Test that a failure inside an expansion removes everything that expansion wrote."""
+        find_file_path = LatexProjectSplitter._find_file_path
+
+        def fail_on_b(self, file_path, relative_to=None):
+            if file_path == "b.tex":
+                raise RuntimeError("lookup failed")
+            return find_file_path(self, file_path, relative_to)
+
+        monkeypatch.setattr(LatexProjectSplitter, "_find_file_path", fail_on_b)
+        content = extract({"doc.tex": "\\input{a}\nend\n", "a.tex": "A\n\\input{b}\n", "b.tex": "B\n"})
+        assert content == "\\input{a}\nend\n"
+
+    def test_section_without_file(self, tmp_path):
+        """Test the placeholder for an entry without source information."""
+        splitter = LatexProjectSplitter(tmp_path)
+        entry = _entry("section", "Lost", None, None)
+        assert splitter._extract_section_content(entry, [entry], 0) == (
+            "% section: Lost\n% No source file information available\n"
+        )
+
+    def test_invalid_line_number(self, tmp_path):
+        """Test the placeholder for a line number past the end of the file."""
+        _write(tmp_path, {"doc.tex": "one\n"})
+        splitter = LatexProjectSplitter(tmp_path)
+        entry = _entry("section", "Far", "doc.tex", 5)
+        assert splitter._extract_section_content(entry, [entry], 0) == (
+            "% section: Far\n% Invalid line number: 5\n"
+        )
+
+    def test_sections_end_at_next_boundary_in_same_file(self, tmp_path):
+        """Test that each section ends at the next same-or-higher level entry in its file."""
+        _write(tmp_path, {
+            "doc.tex": (
+                "\\chapter{One}\n"       # 1
+                "intro\n"                # 2
+                "\\section{A}\n"         # 3
+                "a text\n"               # 4
+                "\\section{B}\n"         # 5
+                "b text\n"               # 6
+                "\\chapter{Two}\n"       # 7
+                "two text\n"             # 8
+            ),
+        })
+        entries = [
+            _entry("chapter", "One", "doc.tex", 1),
+            _entry("section", "A", "doc.tex", 3),
+            _entry("section", "B", "doc.tex", 5),
+            _entry("chapter", "Two", "doc.tex", 7, number="2"),
+        ]
+        output = LatexProjectSplitter(tmp_path).split(entries, tmp_path / "out", validate=False)
+
+        read = {title: path.read_text(encoding="utf-8") for title, path in output.items()}
+        assert read == {
+            "One": "\\chapter{One}\nintro\n\\section{A}\na text\n\\section{B}\nb text\n",
+            "A": "\\section{A}\na text\n",
+            "B": "\\section{B}\nb text\n",
+            "Two": "\\chapter{Two}\ntwo text\n",
+        }
+
+    def test_section_runs_to_end_when_next_boundary_in_other_file(self, tmp_path):
+        """Test that a section runs to the end of its file when the next boundary is elsewhere."""
+        _write(tmp_path, {"a.tex": "\\section{A}\na text\n", "b.tex": "x\n\\section{B}\n"})
+        entries = [_entry("section", "A", "a.tex", 1), _entry("section", "B", "b.tex", 2)]
+        splitter = LatexProjectSplitter(tmp_path)
+        assert splitter._extract_section_content(entries[0], entries, 0) == "\\section{A}\na text\n"
+        assert splitter._extract_section_content(entries[0], entries, 0, 1) == "\\section{A}\na text\n"
+
+    def test_next_boundaries(self):
+        """Test the next same-or-higher level index for every entry."""
+        assert LatexProjectSplitter._next_boundaries([1, 2, 3, 2, 1, 3]) == [4, 3, 3, 4, 6, 6]
+        assert LatexProjectSplitter._next_boundaries([]) == []
+
+    def test_next_other_files(self):
+        """Test the next entry in a different, known source file for every entry."""
+        files = ["a", None, "a", "b", "", "b", "a"]
+        assert LatexProjectSplitter._next_other_files(files) == [3, 2, 3, 6, 5, 6, 7]
+
+    def test_validate_structure_single_file(self):
+        """Test that a project in one source file has no issues."""
+        data = [_entry("chapter", "One", "doc.tex", 1), _entry("section", "A", "doc.tex", 3)]
+        assert LatexProjectSplitter(".").validate_structure(data) == []
+
+    def test_validate_structure_multi_file(self):
+        """Test that sections with nested entries in other files are reported (subsections are left out)."""
+        data = [
+            _entry("chapter", "One", "main.tex", 1),
+            _entry("section", "A", "main.tex", 3),
+            _entry("section", "B", "ch1.tex", 1),
+            _entry("subsection", "B1", "ch1b.tex", 4),
+            _entry("chapter", "Two", "main.tex", 9, number="2"),
+            _entry("section", "C", "main.tex", 10),
+            _entry("section", "D", "ch2.tex", 1),
+        ]
+        issues = LatexProjectSplitter(".").validate_structure(data)
+
+        assert [(i["index"], i["affected_file"], i["affected_line"]) for i in issues] == [
+            (0, "ch1.tex", 1),
+            (3, "ch2.tex", 1),
+        ]
+        assert all(i["severity"] == "warning" for i in issues)
+        assert "has nested content in different file" in issues[0]["issue"]
+        assert "may have content in different file" in issues[1]["issue"]
+        assert issues[0]["source_file"] == "main.tex" and issues[0]["source_line"] == 1
+
+    def test_validate_structure_with_subsections(self):
+        """Test that subsections in other files are reported when subsections are included."""
+        data = [
+            _entry("section", "B", "ch1.tex", 1),
+            _entry("subsection", "B1", "ch1b.tex", 4),
+            _entry("section", "C", "ch1.tex", 9),
+        ]
+        splitter = LatexProjectSplitter(".")
+        assert splitter.validate_structure(data) == []
+
+        issues = splitter.validate_structure(data, include_subsections=True)
+        assert [(i["index"], i["affected_file"]) for i in issues] == [(0, "ch1b.tex")]
+
+    def test_split_warns_about_issues(self, tmp_path, capsys):
+        """Test that split() turns validation issues into warnings."""
+        _write(tmp_path, {"main.tex": "\\chapter{One}\n", "ch1.tex": "\\section{A}\n"})
+        data = [_entry("chapter", "One", "main.tex", 1), _entry("section", "A", "ch1.tex", 1)]
+        with pytest.warns(UserWarning, match="One"):
+            LatexProjectSplitter(tmp_path).split(data, tmp_path / "out")
+        assert "Validation found 1 potential issue(s)" in capsys.readouterr().out
+
+    def test_duplicate_titles_get_suffixes(self, tmp_path):
+        """Test that repeated titles get numbered filenames that skip ones already taken."""
+        _write(tmp_path, {"doc.tex": "".join(f"line {i}\n" for i in range(1, 7))})
+        titles = ["Intro", "Intro_1", "Intro", "Intro", "???", "???"]
+        entries = [_entry("section", t, "doc.tex", i, number=str(i)) for i, t in enumerate(titles, 1)]
+        splitter = LatexProjectSplitter(tmp_path)
+
+        output = splitter.split(entries, tmp_path / "out", validate=False)
+
+        names = sorted(p.name for p in (tmp_path / "out").iterdir())
+        assert names == ["Intro.tex", "Intro_1.tex", "Intro_2.tex", "Intro_3.tex", "section_5.tex", "section_6.tex"]
+        # Titles map to the file written last for them
+        assert output["Intro"].name == "Intro_3.tex"
+        assert (tmp_path / "out" / "Intro_2.tex").read_text(encoding="utf-8") == "line 3\n"
+
+    def test_split_clears_caches(self, tmp_path):
+        """Test that split() drops its per-run caches afterwards."""
+        _write(tmp_path, {"doc.tex": "\\input{a}\n", "a.tex": "A\n"})
+        splitter = LatexProjectSplitter(tmp_path)
+        splitter.split([_entry("section", "S", "doc.tex", 1)], tmp_path / "out", validate=False)
+        assert splitter._file_cache == {}
+        assert splitter._path_cache == {}
+        assert splitter._name_index is None
+
+    def test_split_rereads_changed_files(self, tmp_path):
+        """Test that a second split() sees files changed since the first."""
+        _write(tmp_path, {"doc.tex": "old\n"})
+        splitter = LatexProjectSplitter(tmp_path)
+        entries = [_entry("section", "S", "doc.tex", 1)]
+        splitter.split(entries, tmp_path / "out", validate=False)
+        _write(tmp_path, {"doc.tex": "new\n"})
+        output = splitter.split(entries, tmp_path / "out", validate=False)
+        assert output["S"].read_text(encoding="utf-8") == "new\n"